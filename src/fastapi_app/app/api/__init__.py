@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from .endpoints import devices, metrics, network, websocket
+from .endpoints import devices, internal, metrics, network, websocket
 
 router = APIRouter()
 
 router.include_router(devices.router, prefix="/devices", tags=["devices"])
 router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 router.include_router(network.router, prefix="/network", tags=["network"])
-router.include_router(websocket.router, prefix="/ws", tags=["websocket"])
\ No newline at end of file
+router.include_router(websocket.router, prefix="/ws", tags=["websocket"])
+router.include_router(internal.router, prefix="/internal", tags=["internal"])
@@ -1,38 +1,87 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
-from ...core.database import get_db
+from datetime import datetime
+from ...core.cache import ReadThroughCache
+from ...core.config import settings
+from ...core.database import AsyncSessionLocal, get_db
 from ...models import Device
 from ...schemas.device import DeviceCreate, DeviceResponse, DeviceUpdate
+from ...services.device_inventory import device_inventory
 
 router = APIRouter()
 
+# Device rows change rarely; reads are served from here and every write
+# in this router invalidates the whole namespace
+device_cache = ReadThroughCache("devices", ttl=settings.DEVICE_CACHE_TTL)
+
+
+DEVICE_COLUMNS = [
+    Device.id,
+    Device.name,
+    Device.ip_address,
+    Device.device_type,
+    Device.username,
+    Device.password,
+    Device.is_active,
+    Device.last_seen,
+    Device.created_at,
+    Device.updated_at,
+]
+
+
+def _serialize(device: Device) -> dict:
+    return DeviceResponse.model_validate(device).model_dump(mode="json")
+
+
+def _serialize_row(row) -> dict:
+    # Column tuples skip ORM identity-map bookkeeping and pydantic; values
+    # must still be JSON-ready because they land in the cache
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row._mapping.items()
+    }
+
+
+async def _load_devices(db: AsyncSession, query) -> List[dict]:
+    if settings.FAST_JSON_RESPONSES:
+        result = await db.execute(query.with_only_columns(*DEVICE_COLUMNS))
+        return [_serialize_row(row) for row in result.all()]
+    result = await db.execute(query)
+    return [_serialize(device) for device in result.scalars().all()]
+
 
 @router.get("/", response_model=List[DeviceResponse])
 async def get_devices(
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    limit: int = 100
 ):
     """Get all devices."""
-    result = await db.execute(
-        select(Device).offset(skip).limit(limit)
-    )
-    devices = result.scalars().all()
+    # Single-flight waiters share this load, so it owns its session rather
+    # than borrowing the first caller's
+    async def load():
+        async with AsyncSessionLocal() as session:
+            return await _load_devices(session, select(Device).offset(skip).limit(limit))
+    
+    devices = await device_cache.get_or_load(f"list:{skip}:{limit}", load)
+    if settings.FAST_JSON_RESPONSES:
+        # Cached dicts already match DeviceResponse; response_model stays
+        # declared above so the OpenAPI schema is unchanged
+        return ORJSONResponse(devices)
     return devices
 
 
 @router.get("/{device_id}", response_model=DeviceResponse)
-async def get_device(
-    device_id: int,
-    db: AsyncSession = Depends(get_db)
-):
+async def get_device(device_id: int):
     """Get a specific device."""
-    result = await db.execute(
-        select(Device).where(Device.id == device_id)
-    )
-    device = result.scalar_one_or_none()
+    async def load():
+        async with AsyncSessionLocal() as session:
+            devices = await _load_devices(session, select(Device).where(Device.id == device_id))
+        return devices[0] if devices else None
+    
+    device = await device_cache.get_or_load(f"item:{device_id}", load)
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
     return device
@@ -48,6 +97,8 @@ async def create_device(
     db.add(db_device)
     await db.commit()
     await db.refresh(db_device)
+    device_inventory.upsert(db_device)
+    await device_cache.invalidate()
     return db_device
 
 
@@ -70,6 +121,8 @@ async def update_device(
     
     await db.commit()
     await db.refresh(device)
+    device_inventory.upsert(device)
+    await device_cache.invalidate()
     return device
 
 
@@ -88,4 +141,6 @@ async def delete_device(
     
     await db.delete(device)
     await db.commit()
+    device_inventory.remove(device_id)
+    await device_cache.invalidate()
     return {"message": "Device deleted successfully"}
\ No newline at end of file
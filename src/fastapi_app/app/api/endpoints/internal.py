@@ -0,0 +1,68 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from ...core.config import settings
+from ...core.database import engine
+from ...core.db_stats import db_stats
+from ...core.profiling import profile_store
+from ...core.startup import startup_timer
+
+router = APIRouter()
+
+
+@router.get("/db")
+async def get_db_stats():
+    """Connection pool usage, checkout wait times and recent slow queries."""
+    return db_stats.snapshot(engine.pool)
+
+
+@router.get("/startup")
+async def get_startup_report():
+    """Time spent in each startup phase of this worker."""
+    return startup_timer.report()
+
+
+def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    """Profiles are only readable with the same token that requests them.
+
+    They expose code paths and argument values, so with profiling disabled
+    the routes do not exist, and without ``PROFILING_TOKEN`` set nothing
+    can read them.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if (
+        not settings.PROFILING_TOKEN
+        or x_profile_token is None
+        or not hmac.compare_digest(
+            x_profile_token.encode(), settings.PROFILING_TOKEN.encode()
+        )
+    ):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def list_profiles():
+    """Captured request profiles, newest first."""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """A profile as pstats text, or as a .pstats file for snakeviz and friends."""
+    captured = profile_store.get(profile_id)
+    if captured is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            content=captured.pstats_bytes(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+        )
+    return PlainTextResponse(captured.text(sort, limit))
@@ -1,25 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
-from datetime import datetime, timedelta
-from ...core.database import get_db
-from ...models import NetworkMetric
-from ...schemas.metrics import MetricCreate, MetricResponse
+from sqlalchemy import (
+    String,
+    column,
+    extract,
+    func,
+    insert,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    values,
+)
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import base64
+import csv
+import io
+import json
+from ...core.config import settings
+from ...core.database import AsyncSessionLocal, get_db
+from ...models import Device, NetworkMetric
+from ...schemas.metrics import (
+    MetricBatchChunkResult,
+    MetricBatchItem,
+    MetricBatchResponse,
+    MetricCreate,
+    MetricResponse,
+)
+from ...services.last_value_cache import last_value_cache
+from ...services.metric_writer import metric_writer
 
 router = APIRouter()
 
+METRIC_COLUMNS = ["id", "device_id", "timestamp", "metric_type", "value", "unit", "metadata"]
 
-@router.get("/", response_model=List[MetricResponse])
-async def get_metrics(
-    device_id: Optional[int] = Query(None),
-    metric_type: Optional[str] = Query(None),
-    hours: int = Query(24, description="Number of hours to look back"),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get network metrics with optional filtering."""
-    query = select(NetworkMetric)
-    
+
+def _filter_history(query, device_id: Optional[int], metric_type: Optional[str], hours: int):
     # Filter by device
     if device_id:
         query = query.where(NetworkMetric.device_id == device_id)
@@ -30,29 +49,479 @@ async def get_metrics(
     
     # Filter by time range
     time_threshold = datetime.utcnow() - timedelta(hours=hours)
-    query = query.where(NetworkMetric.timestamp >= time_threshold)
+    return query.where(NetworkMetric.timestamp >= time_threshold)
+
+
+def _encode_cursor(timestamp: datetime, metric_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{metric_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, metric_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(metric_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/", response_model=List[MetricResponse])
+async def get_metrics(
+    response: Response,
+    device_id: Optional[int] = Query(None),
+    metric_type: Optional[str] = Query(None),
+    hours: int = Query(24, description="Number of hours to look back"),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get network metrics with optional filtering.
+
+    Results are newest first and keyset-paginated on (timestamp, id): when
+    more rows exist, the ``X-Next-Cursor`` response header holds the cursor
+    for the next page.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        table = NetworkMetric.__table__
+        query = select(*[table.c[name] for name in METRIC_COLUMNS])
+    else:
+        query = select(NetworkMetric)
+    query = _filter_history(query, device_id, metric_type, hours)
+    
+    # Resume strictly after the last row of the previous page
+    if cursor:
+        query = query.where(
+            tuple_(NetworkMetric.timestamp, NetworkMetric.id) < tuple_(*_decode_cursor(cursor))
+        )
     
-    # Order by timestamp
-    query = query.order_by(NetworkMetric.timestamp.desc()).limit(1000)
+    # Order by timestamp, id breaks ties so pages never overlap
+    query = query.order_by(
+        NetworkMetric.timestamp.desc(),
+        NetworkMetric.id.desc()
+    ).limit(limit + 1)
     
     result = await db.execute(query)
+    if settings.FAST_JSON_RESPONSES:
+        rows = result.all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            headers["X-Next-Cursor"] = _encode_cursor(last.timestamp, last.id)
+        # Rows already carry MetricResponse's fields; response_model stays
+        # declared so the OpenAPI schema is unchanged
+        return ORJSONResponse([dict(row._mapping) for row in rows], headers=headers)
+    
     metrics = result.scalars().all()
+    if len(metrics) > limit:
+        metrics = metrics[:limit]
+        last = metrics[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.timestamp, last.id)
     return metrics
 
 
+async def _export_rows(query, export_format: str) -> AsyncIterator[str]:
+    """Stream rows from a server-side cursor, one fetch batch at a time."""
+    # The request's session is closed before the body streams, so the
+    # export owns its session for the lifetime of the response
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(METRIC_COLUMNS)
+            yield buffer.getvalue()
+        async for partition in result.partitions(settings.EXPORT_FETCH_SIZE):
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in partition:
+                    writer.writerow([
+                        row.id, row.device_id, row.timestamp.isoformat(),
+                        row.metric_type, row.value, row.unit,
+                        json.dumps(row._mapping["metadata"])
+                    ])
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({
+                        **row._mapping,
+                        "timestamp": row.timestamp.isoformat()
+                    }) + "\n"
+                    for row in partition
+                )
+
+
+@router.get("/export")
+async def export_metrics(
+    device_id: Optional[int] = Query(None),
+    metric_type: Optional[str] = Query(None),
+    hours: int = Query(24, description="Number of hours to look back"),
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv")
+):
+    """Export metric history as NDJSON or CSV in constant memory."""
+    if export_format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {export_format}")
+    table = NetworkMetric.__table__
+    query = _filter_history(
+        select(*[table.c[name] for name in METRIC_COLUMNS]),
+        device_id,
+        metric_type,
+        hours
+    ).order_by(NetworkMetric.timestamp, NetworkMetric.id)
+    
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(query, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="network_metrics.{export_format}"'
+        }
+    )
+
+
+# Supported /series bucket widths in seconds
+SERIES_BUCKETS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "6h": 21600,
+    "1d": 86400,
+}
+
+SERIES_AGGREGATES = {
+    "avg": lambda value: func.avg(value),
+    "min": lambda value: func.min(value),
+    "max": lambda value: func.max(value),
+    "count": lambda value: func.count(value),
+    "p95": lambda value: func.percentile_cont(0.95).within_group(value),
+}
+
+# Upper bound on buckets per series so one request can't ask for huge payloads
+MAX_SERIES_POINTS = 5000
+
+
+@router.get("/series")
+async def get_metric_series(
+    device_id: Optional[int] = Query(None),
+    metric_type: Optional[str] = Query(None),
+    hours: int = Query(24, description="Number of hours to look back"),
+    bucket: str = Query("5m", description="Bucket width: 1m, 5m, 15m, 1h, 6h or 1d"),
+    agg: str = Query("avg", description="Aggregate: avg, min, max, p95 or count"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get metrics downsampled into time buckets, aggregated in SQL."""
+    if bucket not in SERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported bucket: {bucket}")
+    if agg not in SERIES_AGGREGATES:
+        raise HTTPException(status_code=400, detail=f"Unsupported aggregate: {agg}")
+    seconds = SERIES_BUCKETS[bucket]
+    if hours * 3600 / seconds > MAX_SERIES_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too long for {bucket} buckets; use a wider bucket"
+        )
+
+    # Align samples to bucket starts on the epoch grid. The width is inlined
+    # (it comes from SERIES_BUCKETS) so SELECT and GROUP BY render the same
+    # expression instead of two different bind parameters.
+    width = literal_column(str(seconds))
+    bucket_start = func.to_timestamp(
+        func.floor(extract("epoch", NetworkMetric.timestamp) / width) * width
+    ).label("bucket")
+    value = SERIES_AGGREGATES[agg](NetworkMetric.value).label("value")
+
+    time_threshold = datetime.utcnow() - timedelta(hours=hours)
+    query = (
+        select(
+            NetworkMetric.device_id,
+            NetworkMetric.metric_type,
+            func.min(NetworkMetric.unit).label("unit"),
+            bucket_start,
+            value
+        )
+        .where(NetworkMetric.timestamp >= time_threshold)
+        .group_by(NetworkMetric.device_id, NetworkMetric.metric_type, bucket_start)
+        .order_by(NetworkMetric.device_id, NetworkMetric.metric_type, bucket_start)
+    )
+    if device_id:
+        query = query.where(NetworkMetric.device_id == device_id)
+    if metric_type:
+        query = query.where(NetworkMetric.metric_type == metric_type)
+
+    result = await db.execute(query)
+
+    series: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for row in result:
+        key = (row.device_id, row.metric_type)
+        if key not in series:
+            series[key] = {
+                "device_id": row.device_id,
+                "metric_type": row.metric_type,
+                "unit": row.unit,
+                "points": []
+            }
+        series[key]["points"].append([row.bucket, row.value])
+
+    return {
+        "bucket": bucket,
+        "agg": agg,
+        "start": time_threshold,
+        "series": list(series.values())
+    }
+
+
 @router.post("/", response_model=MetricResponse)
 async def create_metric(
     metric: MetricCreate,
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new metric entry."""
-    db_metric = NetworkMetric(**metric.dict())
+    db_metric = NetworkMetric(**metric.dict(exclude={"metadata"}), metadata_=metric.metadata)
     db.add(db_metric)
     await db.commit()
     await db.refresh(db_metric)
+    await last_value_cache.record([{
+        "device_id": db_metric.device_id,
+        "metric_type": db_metric.metric_type,
+        "value": db_metric.value,
+        "unit": db_metric.unit,
+        "timestamp": db_metric.timestamp
+    }])
     return db_metric
 
 
+# Errors reported per chunk are capped to keep responses small
+MAX_CHUNK_ERRORS = 20
+
+batch_adapter = TypeAdapter(List[MetricBatchItem])
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line number, parsed object or error) from a streamed NDJSON body."""
+    buffer = b""
+    line_no = 0
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+            line_no += 1
+    if buffer.strip():
+        try:
+            yield line_no, json.loads(buffer)
+        except ValueError as e:
+            yield line_no, e
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    try:
+        records = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of metrics")
+    for index, record in enumerate(records):
+        yield index, record
+
+
+def _validate_chunk(
+    records: List[Tuple[int, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate a chunk in one pass; only re-check rows when something fails."""
+    errors = []
+    candidates = []
+    for index, record in records:
+        if isinstance(record, Exception):
+            errors.append({"index": index, "error": f"invalid JSON: {record}"})
+        else:
+            candidates.append((index, record))
+
+    try:
+        items = batch_adapter.validate_python([record for _, record in candidates])
+    except ValidationError as e:
+        bad = {}
+        for error in e.errors():
+            position = error["loc"][0]
+            bad.setdefault(position, f"{'.'.join(map(str, error['loc'][1:]))}: {error['msg']}")
+        for position, message in sorted(bad.items()):
+            errors.append({"index": candidates[position][0], "error": message})
+        candidates = [c for position, c in enumerate(candidates) if position not in bad]
+        items = batch_adapter.validate_python([record for _, record in candidates])
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for item in items:
+        row = item.model_dump()
+        row["timestamp"] = row["timestamp"] or now
+        row["metadata"] = row["metadata"] or {}
+        rows.append(row)
+    return rows, errors
+
+
+async def _insert_chunk(
+    db: AsyncSession,
+    chunk_index: int,
+    records: List[Tuple[int, Any]]
+) -> MetricBatchChunkResult:
+    rows, errors = _validate_chunk(records)
+    accepted = 0
+    if rows:
+        try:
+            # One multi-row INSERT per chunk, committed independently
+            await db.execute(insert(NetworkMetric.__table__).values(rows))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            errors.append({"index": None, "error": f"insert failed: {e}"})
+        else:
+            # Only the insert is reported as a failure; the rows are
+            # committed by now whatever happens to the cache
+            accepted = len(rows)
+            await last_value_cache.record(rows)
+    return MetricBatchChunkResult(
+        chunk=chunk_index,
+        accepted=accepted,
+        rejected=len(records) - accepted,
+        errors=errors[:MAX_CHUNK_ERRORS]
+    )
+
+
+@router.post("/batch", response_model=MetricBatchResponse)
+async def create_metrics_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk-ingest metrics from a JSON array or a streamed NDJSON body.
+
+    Send ``Content-Type: application/x-ndjson`` to stream one metric per
+    line; anything else is parsed as a JSON array. Records are validated
+    and inserted in chunks of ``METRICS_BATCH_CHUNK_SIZE``, and the result
+    of every chunk is reported separately.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        records = _iter_ndjson(request)
+    else:
+        records = _iter_json_array(request)
+
+    chunk_size = settings.METRICS_BATCH_CHUNK_SIZE
+    chunks: List[MetricBatchChunkResult] = []
+    pending: List[Tuple[int, Any]] = []
+    async for record in records:
+        pending.append(record)
+        if len(pending) >= chunk_size:
+            chunks.append(await _insert_chunk(db, len(chunks), pending))
+            pending = []
+    if pending:
+        chunks.append(await _insert_chunk(db, len(chunks), pending))
+
+    return MetricBatchResponse(
+        accepted=sum(chunk.accepted for chunk in chunks),
+        rejected=sum(chunk.rejected for chunk in chunks),
+        chunks=chunks
+    )
+
+
+async def _metric_types(db: AsyncSession, device_ids: Optional[List[int]] = None) -> List[str]:
+    """Distinct metric types present, found with a recursive skip-scan.
+
+    Each step is one ``ix_network_metrics_device_type_ts`` probe for the
+    next (device, metric type) pair, so the cost grows with the number of
+    pairs rather than the number of rows.
+    """
+    def pairs_after(query):
+        if device_ids:
+            query = query.where(NetworkMetric.device_id.in_(device_ids))
+        return query.order_by(NetworkMetric.device_id, NetworkMetric.metric_type).limit(1)
+
+    pairs = pairs_after(
+        select(NetworkMetric.device_id, NetworkMetric.metric_type)
+    ).cte("pairs", recursive=True)
+    next_pair = pairs_after(
+        select(NetworkMetric.device_id, NetworkMetric.metric_type).where(
+            tuple_(NetworkMetric.device_id, NetworkMetric.metric_type)
+            > tuple_(pairs.c.device_id, pairs.c.metric_type)
+        )
+    ).lateral("next_pair")
+    pairs = pairs.union_all(
+        select(next_pair.c.device_id, next_pair.c.metric_type)
+        .select_from(pairs)
+        .join(next_pair, true())
+    )
+    result = await db.execute(select(pairs.c.metric_type).distinct())
+    return list(result.scalars())
+
+
+async def _latest_metrics(
+    db: AsyncSession,
+    device_ids: Optional[List[int]] = None,
+    metric_types: Optional[List[str]] = None
+):
+    """Latest value per (device, metric type).
+
+    A LATERAL join does one ``ix_network_metrics_device_type_ts`` probe
+    per device and type. Without explicit metric types, the types present
+    are found first with an index skip-scan.
+    """
+    if not metric_types:
+        metric_types = await _metric_types(db, device_ids)
+        if not metric_types:
+            return []
+
+    wanted = values(
+        column("metric_type", String), name="wanted"
+    ).data([(metric_type,) for metric_type in metric_types])
+    latest = (
+        select(NetworkMetric.value, NetworkMetric.unit, NetworkMetric.timestamp)
+        .where(NetworkMetric.device_id == Device.id)
+        .where(NetworkMetric.metric_type == wanted.c.metric_type)
+        .order_by(NetworkMetric.timestamp.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    query = (
+        select(
+            Device.id.label("device_id"),
+            wanted.c.metric_type,
+            latest.c.value,
+            latest.c.unit,
+            latest.c.timestamp
+        )
+        .select_from(Device)
+        .join(wanted, true())
+        .join(latest, true())
+    )
+    if device_ids:
+        query = query.where(Device.id.in_(device_ids))
+
+    result = await db.execute(query)
+    return result.all()
+
+
+@router.get("/latest")
+async def get_latest_metrics(
+    device_id: Optional[List[int]] = Query(None),
+    metric_type: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the latest value of each metric type for any number of devices."""
+    latest: Dict[int, Dict[str, Any]] = {}
+    for row in await _latest_metrics(db, device_id, metric_type):
+        latest.setdefault(row.device_id, {})[row.metric_type] = {
+            "value": row.value,
+            "unit": row.unit,
+            "timestamp": row.timestamp
+        }
+    return latest
+
+
 @router.get("/realtime/{device_id}")
 async def get_realtime_metrics(
     device_id: int,
@@ -61,22 +530,29 @@ async def get_realtime_metrics(
     """Get the latest metrics for a device."""
     # Get the most recent metric for each type
     metric_types = ["bandwidth", "latency", "packet_loss"]
-    latest_metrics = {}
+    latest_metrics, missing = await last_value_cache.get(device_id, metric_types)
     
-    for metric_type in metric_types:
-        result = await db.execute(
-            select(NetworkMetric)
-            .where(NetworkMetric.device_id == device_id)
-            .where(NetworkMetric.metric_type == metric_type)
-            .order_by(NetworkMetric.timestamp.desc())
-            .limit(1)
+    # Cold miss: read what the cache doesn't know yet and remember it
+    if missing:
+        rows = await _latest_metrics(db, [device_id], missing)
+        await last_value_cache.record([row._mapping for row in rows])
+        # Types with no rows at all would otherwise hit the database on
+        # every refresh
+        last_value_cache.record_misses(
+            device_id,
+            set(missing) - {row.metric_type for row in rows}
         )
-        metric = result.scalar_one_or_none()
-        if metric:
-            latest_metrics[metric_type] = {
-                "value": metric.value,
-                "unit": metric.unit,
-                "timestamp": metric.timestamp
+        for row in rows:
+            latest_metrics[row.metric_type] = {
+                "value": row.value,
+                "unit": row.unit,
+                "timestamp": row.timestamp
             }
     
-    return latest_metrics
\ No newline at end of file
+    return latest_metrics
+
+
+@router.get("/ingest/stats")
+async def get_ingest_stats():
+    """Queue depth and flush statistics for the metric persistence pipeline."""
+    return metric_writer.stats()
@@ -1,27 +1,88 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from typing import Dict, List
-import asyncio
-from ...services.network_scanner import NetworkScanner
-from ...services.performance_tester import PerformanceTester
-from ...core.config import settings
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict
+import json
+from ...services.device_status import device_status
 
 router = APIRouter()
 
-# Initialize services
-network_scanner = NetworkScanner()
-perf_tester = PerformanceTester()
+DEFAULT_SUBNET = "192.168.1.0/24"
+
+# Services are built on first use so importing the router stays cheap
+_network_scanner = None
+_perf_tester = None
+
+
+def get_network_scanner():
+    global _network_scanner
+    if _network_scanner is None:
+        from ...services.network_scanner import NetworkScanner
+        _network_scanner = NetworkScanner()
+    return _network_scanner
+
+
+def get_perf_tester():
+    global _perf_tester
+    if _perf_tester is None:
+        from ...services.performance_tester import PerformanceTester
+        _perf_tester = PerformanceTester()
+    return _perf_tester
 
 
 @router.get("/scan")
 async def scan_network():
     """Perform a network scan to discover active devices."""
-    results = await network_scanner.scan_subnet("192.168.1.0/24")
+    results = await get_network_scanner().scan_subnet(DEFAULT_SUBNET)
     return {
         "active_hosts": len(results),
         "devices": results
     }
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    from ...services.network_scanner import ScanLimitError
+    
+    try:
+        async for event in events:
+            yield _sse_event(event['event'], event['data'])
+    except ScanLimitError as e:
+        # Lost the race for the last slot after the 429 check passed
+        yield _sse_event('error', {'detail': str(e)})
+
+
+@router.get("/scan/stream")
+async def scan_network_stream(
+    subnet: str = Query(DEFAULT_SUBNET, description="IPv4 CIDR to sweep")
+):
+    """Stream a scan as Server-Sent Events.
+
+    Emits a ``host`` event per active host as it answers, periodic
+    ``progress`` events and a final ``summary``. Disconnecting stops the
+    sweep. Only private ranges (or ``SCAN_ALLOWED_SUBNETS``) may be
+    swept, and at most ``SCAN_MAX_CONCURRENT_STREAMS`` streams run at once.
+    """
+    scanner = get_network_scanner()
+    try:
+        scanner.validate_subnet(subnet)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if scanner.streams_full():
+        raise HTTPException(status_code=429, detail="Too many scans in progress")
+    return StreamingResponse(
+        _sse(scanner.scan_events(subnet)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.post("/test/bandwidth")
 async def test_bandwidth(
     source: str,
@@ -29,7 +90,7 @@ async def test_bandwidth(
     duration: int = 10
 ):
     """Run bandwidth test between two devices."""
-    result = await perf_tester.run_iperf3_test(source, target, duration)
+    result = await get_perf_tester().run_iperf3_test(source, target, duration)
     return result
 
 
@@ -39,26 +100,15 @@ async def test_latency(
     count: int = 10
 ):
     """Test network latency to a target."""
-    result = await perf_tester.run_ping_test(target, count)
+    result = await get_perf_tester().run_ping_test(target, count)
     return result
 
 
 @router.get("/devices/status")
 async def get_device_status():
-    """Get current status of all configured devices."""
-    devices = [
-        {"name": "pi0", "host": settings.PI0_HOST},
-        {"name": "pi1", "host": settings.PI1_HOST},
-        {"name": "router", "host": settings.ROUTER_HOST},
-    ]
-    
-    status_results = []
-    for device in devices:
-        is_reachable = await network_scanner.is_device_reachable(device["host"])
-        status_results.append({
-            "name": device["name"],
-            "host": device["host"],
-            "status": "online" if is_reachable else "offline"
-        })
-    
-    return status_results
\ No newline at end of file
+    """Get current status of all configured devices.
+
+    Served from the background reachability cache; ``age_seconds`` says
+    how old each result is.
+    """
+    return device_status.statuses()
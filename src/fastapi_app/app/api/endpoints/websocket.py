@@ -1,56 +1,237 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from typing import Any, Dict, Optional, Union
 import asyncio
 import json
+import logging
+from ...core.config import settings
+from ...core.prometheus import WEBSOCKET_CONNECTIONS
 from ...services.metrics_collector import MetricsCollector
+from ...services.metric_writer import metric_writer
+from ...services.metrics_producer import MetricsProducer
+from ...services.metrics_stream import (
+    PROTOCOL_DELTA_JSON,
+    PROTOCOL_DELTA_MSGPACK,
+    SnapshotFrames,
+    select_subprotocol,
+)
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class ClientConnection:
+    """A connected websocket with its own bounded outgoing queue."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        queue_size: int,
+        protocol: Optional[str] = None
+    ):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.needs_keyframe = True
+
+    @property
+    def uses_deltas(self) -> bool:
+        return self.protocol in (PROTOCOL_DELTA_JSON, PROTOCOL_DELTA_MSGPACK)
+
+    def enqueue(self, message: Union[str, bytes]):
+        # Slow consumer: drop the oldest frame rather than block the producer
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def offer(self, frames: SnapshotFrames):
+        """Queue the right encoding of a snapshot for this client."""
+        if not self.uses_deltas:
+            self.enqueue(frames.full())
+            return
+        binary = self.protocol == PROTOCOL_DELTA_MSGPACK
+        if self.queue.full():
+            # Dropping a delta would corrupt the client's state, so discard
+            # the backlog and resynchronise with a keyframe instead.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.needs_keyframe = True
+        if self.needs_keyframe:
+            self.needs_keyframe = False
+            self.queue.put_nowait(frames.keyframe(binary))
+        else:
+            self.queue.put_nowait(frames.delta(binary))
+
+    async def pump(self):
+        """Send queued frames until the client goes away or stalls."""
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, bytes):
+                send = self.websocket.send_bytes(message)
+            else:
+                send = self.websocket.send_text(message)
+            # asyncio.timeout, unlike wait_for on 3.11, never swallows the
+            # cancellation that stops this pump
+            async with asyncio.timeout(settings.WS_SEND_TIMEOUT):
+                await send
+
 
 # Store active connections
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-    
+    def __init__(self, queue_size: int = 8):
+        self.queue_size = queue_size
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.latest: Optional[SnapshotFrames] = None
+        self.seq = 0
+
+    async def connect(self, websocket: WebSocket) -> ClientConnection:
+        protocol = select_subprotocol(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=protocol)
+        client = ClientConnection(websocket, self.queue_size, protocol)
+        self.active_connections[websocket] = client
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+        # Late joiners get the current snapshot (a keyframe for delta
+        # clients) instead of waiting a cycle
+        if self.latest is not None:
+            client.offer(self.latest)
+        return client
+
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-    
+        self.active_connections.pop(websocket, None)
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
-    
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
 
+    async def broadcast(self, snapshot: Dict[str, Any]):
+        """Fan a snapshot out to every client's queue without awaiting sends."""
+        self.seq += 1
+        previous = self.latest.snapshot if self.latest else None
+        self.latest = SnapshotFrames(self.seq, snapshot, previous)
+        for client in list(self.active_connections.values()):
+            client.offer(self.latest)
 
-manager = ConnectionManager()
+
+manager = ConnectionManager(queue_size=settings.WS_CLIENT_QUEUE_SIZE)
 metrics_collector = MetricsCollector()
+metrics_producer = MetricsProducer(
+    metrics_collector,
+    interval=settings.METRICS_POLL_INTERVAL
+)
+
+
+async def publish_metrics(snapshot: Dict[str, Any]):
+    # Each encoding is built once per snapshot, not once per client
+    await manager.broadcast(snapshot)
+
+
+metrics_producer.subscribe(publish_metrics)
+if settings.METRICS_PERSIST:
+    metrics_producer.subscribe(metric_writer.submit_snapshot)
+
+
+async def _drain_incoming(websocket: WebSocket):
+    # Clients don't send anything meaningful; reading detects disconnects.
+    # receive() rather than receive_text(), which fails on binary frames.
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
 
 
 @router.websocket("/metrics")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time metrics streaming."""
-    await manager.connect(websocket)
+    """WebSocket endpoint for real-time metrics streaming.
+
+    Without a subprotocol every update is the full JSON snapshot. Clients
+    offering ``vandine.delta.v1+json`` (or ``+msgpack`` for binary frames)
+    get a keyframe on connect followed by merge-patch deltas.
+    """
+    client = await manager.connect(websocket)
+    receiver = asyncio.create_task(_drain_incoming(websocket))
+    sender = asyncio.create_task(client.pump())
     try:
-        # Start sending metrics
-        while True:
-            # Collect metrics from all devices
-            metrics = await metrics_collector.collect_all_metrics()
-            
-            # Send metrics to client
-            await websocket.send_json({
-                "type": "metrics_update",
-                "data": metrics
-            })
-            
-            # Wait before next update
-            await asyncio.sleep(5)  # Update every 5 seconds
-            
-    except WebSocketDisconnect:
+        done, pending = await asyncio.wait(
+            {receiver, sender},
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.warning("WebSocket error: %r", error)
+        if sender in done:
+            # Stalled or failed sender: close so the client reconnects
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+    finally:
+        receiver.cancel()
+        sender.cancel()
         manager.disconnect(websocket)
-    except Exception as e:
-        manager.disconnect(websocket)
-        print(f"WebSocket error: {e}")
\ No newline at end of file
+
+
+@router.websocket("/scan")
+async def scan_websocket(websocket: WebSocket):
+    """Stream a network scan over a websocket.
+
+    Pass the subnet as ``?subnet=10.0.0.0/24``. Each event is a JSON text
+    frame ``{"type": "host" | "progress" | "summary", "data": {...}}``;
+    the server closes the socket after the summary. A disallowed subnet
+    closes with 1008 and a full scan limit with 1013, after an ``error``
+    frame.
+    """
+    from .network import DEFAULT_SUBNET, get_network_scanner
+    from ...services.network_scanner import ScanLimitError
+    
+    async def reject(detail: str, code: int):
+        await websocket.send_json({"type": "error", "data": {"detail": detail}})
+        await websocket.close(code=code)
+    
+    await websocket.accept()
+    subnet = websocket.query_params.get("subnet", DEFAULT_SUBNET)
+    scanner = get_network_scanner()
+    try:
+        scanner.validate_subnet(subnet)
+    except ValueError as e:
+        await reject(str(e), 1008)
+        return
+    
+    events = scanner.scan_events(subnet)
+    
+    async def stream():
+        async for event in events:
+            await websocket.send_text(
+                json.dumps({"type": event["event"], "data": event["data"]}, default=str)
+            )
+    
+    # The scan only sends, so read alongside it to notice a client that
+    # goes away while no host is answering
+    sender = asyncio.create_task(stream())
+    receiver = asyncio.create_task(_drain_incoming(websocket))
+    try:
+        done, _ = await asyncio.wait(
+            {sender, receiver},
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        if sender in done:
+            error = sender.exception()
+            if isinstance(error, ScanLimitError):
+                await reject(str(error), 1013)
+            elif error is None:
+                await websocket.close()
+            elif not isinstance(error, (WebSocketDisconnect, RuntimeError, OSError)):
+                logger.warning("Scan websocket error: %r", error)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # Client went away while the socket was being closed
+        pass
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        # Stops the sweep if the sender was cancelled between events
+        await events.aclose()
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from .redis import get_redis
+
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """Versioned read-through cache on Redis with an in-process fallback.
+
+    Keys embed a namespace version, so ``invalidate()`` is a single INCR
+    that orphans every cached entry at once; orphans expire via their TTL.
+    Concurrent misses for the same key share one loader call, and TTLs are
+    jittered so entries written together don't all expire together. When
+    Redis is unreachable the cache keeps working per process and retries
+    Redis after ``redis_retry`` seconds.
+    """
+
+    MAX_LOCAL_ENTRIES = 1024
+
+    def __init__(self, namespace: str, ttl: int = 30, redis_retry: float = 30):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.redis_retry = redis_retry
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        self._local_version = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis_down_until = 0.0
+
+    def _redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        return get_redis()
+
+    def _redis_failed(self, error: Exception):
+        print(f"Cache {self.namespace}: Redis unavailable, using local cache ({error})")
+        self._redis_down_until = time.monotonic() + self.redis_retry
+
+    def _expiry(self) -> int:
+        return int(self.ttl * random.uniform(0.9, 1.1)) or 1
+
+    async def _version(self) -> str:
+        redis = self._redis()
+        if redis is not None:
+            try:
+                version = await redis.get(f"{self.namespace}:version")
+                return f"r{int(version or 0)}"
+            except Exception as e:
+                self._redis_failed(e)
+        return f"l{self._local_version}"
+
+    async def _get(self, key: str) -> Any:
+        redis = self._redis()
+        if redis is not None and key.startswith(f"{self.namespace}:r"):
+            try:
+                payload = await redis.get(key)
+                return _MISSING if payload is None else json.loads(payload)["v"]
+            except Exception as e:
+                self._redis_failed(e)
+        cached = self._local.get(key)
+        if cached is None or cached[0] < time.monotonic():
+            return _MISSING
+        return cached[1]
+
+    async def _set(self, key: str, value: Any):
+        redis = self._redis()
+        if redis is not None and key.startswith(f"{self.namespace}:r"):
+            try:
+                await redis.set(key, json.dumps({"v": value}), ex=self._expiry())
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        now = time.monotonic()
+        if len(self._local) >= self.MAX_LOCAL_ENTRIES:
+            self._local = {k: v for k, v in self._local.items() if v[0] >= now}
+        self._local[key] = (now + self._expiry(), value)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+            await self._set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` on a miss.
+
+        Values must be JSON-serializable; ``None`` is cached like any other.
+        """
+        full_key = f"{self.namespace}:{await self._version()}:{key}"
+        value = await self._get(full_key)
+        if value is not _MISSING:
+            return value
+        task = self._inflight.get(full_key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(full_key, loader))
+            self._inflight[full_key] = task
+        # Shield so one cancelled request doesn't cancel the shared load
+        return await asyncio.shield(task)
+
+    async def invalidate(self):
+        """Drop every entry in the namespace by bumping its version."""
+        self._local_version += 1
+        self._local.clear()
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.incr(f"{self.namespace}:version")
+            except Exception as e:
+                self._redis_failed(e)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "local_entries": len(self._local),
+            "inflight": len(self._inflight)
+        }
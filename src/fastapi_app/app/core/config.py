@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -19,6 +19,15 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SLOW_QUERY_MS: float = 200
+    
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
@@ -30,6 +39,9 @@ class Settings(BaseSettings):
             return f"redis://:{self.REDIS_PASSWORD}@{self.REDIS_HOST}:{self.REDIS_PORT}"
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
     
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    DEVICE_CACHE_TTL: int = 30
+    
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost", "http://localhost:8000"]
     
@@ -45,6 +57,88 @@ class Settings(BaseSettings):
     ROUTER_HOST: str = "192.168.1.1"
     ROUTER_USERNAME: str = "admin"
     ROUTER_PASSWORD: str = ""
+    ROUTER_DEVICE_TYPE: str = "cisco_ios"
+    
+    # Device inventory is reloaded from the devices table this often
+    INVENTORY_REFRESH_INTERVAL: int = 60
+    
+    # Metrics streaming
+    METRICS_POLL_INTERVAL: int = 5
+    WS_CLIENT_QUEUE_SIZE: int = 8
+    WS_SEND_TIMEOUT: int = 10
+    LOCAL_SAMPLE_INTERVAL: float = 1.0
+    
+    # Metric persistence pipeline
+    METRICS_PERSIST: bool = True
+    INGEST_QUEUE_SIZE: int = 10000
+    INGEST_BATCH_SIZE: int = 500
+    INGEST_FLUSH_INTERVAL: float = 2.0
+    # Rows per multi-row INSERT; keep rows x 6 columns under asyncpg's
+    # 32767 bind parameter limit
+    METRICS_BATCH_CHUNK_SIZE: int = 1000
+    
+    # Last-value cache for realtime reads; mirror to Redis to share it
+    # between uvicorn workers
+    LAST_VALUE_REDIS_MIRROR: bool = False
+    LAST_VALUE_LOCAL_TTL: float = 1.0
+    # How long a (device, metric type) with no rows at all is remembered
+    LAST_VALUE_MISS_TTL: float = 10.0
+    
+    # Rows fetched per server-side cursor round trip during exports
+    EXPORT_FETCH_SIZE: int = 5000
+    
+    # Prometheus exposition at /metrics
+    PROMETHEUS_ENABLED: bool = True
+    
+    # Per-request cProfile capture; requests opt in with X-Profile-Token
+    # or are sampled at PROFILING_SAMPLE_RATE
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_KEEP: int = 20
+    
+    # List endpoints read plain column rows and encode them with orjson,
+    # skipping ORM instances and response_model validation
+    FAST_JSON_RESPONSES: bool = False
+    
+    # network_metrics partitioning and retention
+    METRICS_PARTITIONING: bool = True
+    METRICS_RETENTION_DAYS: int = 30
+    METRICS_PARTITION_PREMAKE_DAYS: int = 7
+    PARTITION_MAINTENANCE_INTERVAL: int = 3600
+    
+    # SSH collection backend: "netmiko" (thread pool) or "asyncssh"
+    SSH_BACKEND: str = "netmiko"
+    SSH_MAX_CONCURRENCY: int = 100
+    SSH_COMMAND_TIMEOUT: int = 15
+    
+    # SSH session pool
+    SSH_CONNECT_TIMEOUT: int = 10
+    SSH_KEEPALIVE_INTERVAL: int = 30
+    SSH_IDLE_TIMEOUT: int = 300
+    SSH_HEALTH_CHECK_INTERVAL: int = 60
+    
+    # Device probing: "composite" (one round trip) or "sequential"
+    METRICS_PROBE_MODE: str = "composite"
+    
+    # Subnet sweeps: ICMP where the process may send it, else TCP connects
+    # to SWEEP_TCP_PORTS (auto); probes in flight, packets/s, per-host wait
+    SWEEP_METHOD: str = "auto"
+    SWEEP_CONCURRENCY: int = 512
+    SWEEP_RATE_PPS: float = 2000
+    SWEEP_TIMEOUT: float = 1.0
+    SWEEP_TCP_PORTS: List[int] = [22, 80, 443]
+    SWEEP_MAX_HOSTS: int = 65536
+    # Subnets clients may ask to sweep; empty allows the RFC 1918 ranges
+    SCAN_ALLOWED_SUBNETS: List[str] = []
+    # Streamed scans (SSE and websocket) running at once
+    SCAN_MAX_CONCURRENT_STREAMS: int = 2
+    
+    # Device reachability cache behind /network/devices/status
+    DEVICE_STATUS_INTERVAL: float = 15
+    DEVICE_STATUS_TTL: float = 60
+    DEVICE_STATUS_CONCURRENCY: int = 64
+    DEVICE_STATUS_TIMEOUT: float = 2.0
     
     class Config:
         env_file = ".env"
@@ -2,13 +2,27 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_stats import InstrumentedPool, db_stats
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        # asyncpg's own cache and SQLAlchemy's prepared statement cache;
+        # set both to 0 behind pgbouncer in transaction mode
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
 )
+db_stats.install(engine)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -21,6 +35,13 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+def create_missing_indexes(sync_conn):
+    """create_all skips indexes on tables that already exist; add them here."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 # Dependency to get DB session
 async def get_db():
     async with AsyncSessionLocal() as session:
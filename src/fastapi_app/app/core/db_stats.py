@@ -0,0 +1,95 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .config import settings
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class DatabaseStats:
+    """Connection-wait timings and slow statements for the async engine."""
+
+    def __init__(self, slow_query_ms: float = 200, keep: int = 50):
+        self.slow_query_ms = slow_query_ms
+        self.waits: Deque[float] = deque(maxlen=1000)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.query_count = 0
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=keep)
+
+    def record_wait(self, seconds: float):
+        self.waits.append(seconds)
+        self.wait_count += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.query_count += 1
+        if elapsed_ms >= self.slow_query_ms:
+            self.slow_queries.append({
+                "statement": statement[:1000],
+                "duration_ms": round(elapsed_ms, 2),
+                "executemany": executemany,
+                "at": time.time()
+            })
+
+    def _handle_error(self, context):
+        # after_cursor_execute doesn't fire for failed statements
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    def install(self, engine):
+        """Attach statement timing listeners to an AsyncEngine."""
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        waits = list(self.waits)
+        return {
+            "pool": {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+            },
+            "checkout_wait_ms": {
+                "count": self.wait_count,
+                "avg": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "p50": round(_percentile(waits, 0.50) * 1000, 3),
+                "p95": round(_percentile(waits, 0.95) * 1000, 3),
+                "max": round(self.wait_max * 1000, 3),
+            },
+            "queries": self.query_count,
+            "slow_query_threshold_ms": self.slow_query_ms,
+            "slow_queries": list(self.slow_queries),
+        }
+
+
+db_stats = DatabaseStats(slow_query_ms=settings.DB_SLOW_QUERY_MS)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_stats.record_wait(time.perf_counter() - started)
@@ -0,0 +1,286 @@
+"""Daily range partitions for ``network_metrics``.
+
+Partitions are named ``network_metrics_pYYYYMMDD`` and cover one UTC day.
+Maintenance creates partitions ahead of time and drops whole partitions
+once they fall out of the retention window. It runs from the FastAPI
+lifespan, or by hand::
+
+    python -m app.core.partitions maintain
+    python -m app.core.partitions list
+    python -m app.core.partitions migrate   # convert an existing heap table
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from .config import settings
+from .database import create_missing_indexes
+
+PARENT = "network_metrics"
+DEFAULT_PARTITION = f"{PARENT}_default"
+LEGACY_TABLE = f"{PARENT}_legacy"
+COLUMNS = "id, device_id, timestamp, metric_type, value, unit, metadata"
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT}_p{day:%Y%m%d}"
+
+
+def _parse_partition_day(name: str) -> Optional[date]:
+    prefix = f"{PARENT}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def is_partitioned(conn) -> bool:
+    result = await conn.execute(text(
+        "SELECT EXISTS ("
+        " SELECT 1 FROM pg_partitioned_table pt"
+        " JOIN pg_class c ON c.oid = pt.partrelid"
+        " WHERE c.relname = :name)"
+    ), {"name": PARENT})
+    return bool(result.scalar())
+
+
+async def list_partitions(conn) -> List[Tuple[str, Optional[date]]]:
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i"
+        " JOIN pg_class c ON c.oid = i.inhrelid"
+        " JOIN pg_class p ON p.oid = i.inhparent"
+        " WHERE p.relname = :name ORDER BY c.relname"
+    ), {"name": PARENT})
+    return [(name, _parse_partition_day(name)) for name in result.scalars()]
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    lower = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+    return lower, lower + timedelta(days=1)
+
+
+async def _default_has_rows(conn, day: date) -> bool:
+    lower, upper = _day_bounds(day)
+    result = await conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION}"
+        " WHERE timestamp >= :lower AND timestamp < :upper)"
+    ), {"lower": lower, "upper": upper})
+    return bool(result.scalar())
+
+
+async def create_partitions(conn, start: date, days: int) -> List[str]:
+    """Create daily partitions for ``days`` days from ``start`` if missing.
+
+    Postgres refuses a new partition while DEFAULT holds rows in its range,
+    so those rows are moved out: DEFAULT is detached, the partition
+    created, the rows re-inserted through the parent and DEFAULT attached
+    again.
+    """
+    existing = {name for name, _ in await list_partitions(conn)}
+    created = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        name = partition_name(day)
+        if name in existing:
+            continue
+        lower, upper = _day_bounds(day)
+        move = DEFAULT_PARTITION in existing and await _default_has_rows(conn, day)
+        if move:
+            await conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+        # Identifiers and bounds are generated here, never user input
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT}"
+            f" FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        if move:
+            bounds = {"lower": lower, "upper": upper}
+            await conn.execute(text(
+                f"INSERT INTO {PARENT} ({COLUMNS}) SELECT {COLUMNS} FROM {DEFAULT_PARTITION}"
+                " WHERE timestamp >= :lower AND timestamp < :upper"
+            ), bounds)
+            await conn.execute(text(
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :lower AND timestamp < :upper"
+            ), bounds)
+            await conn.execute(text(
+                f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+            ))
+        created.append(name)
+    # Catches rows outside every daily range, e.g. very old backfills
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"
+    ))
+    return created
+
+
+async def drop_expired(conn, retention_days: int) -> List[str]:
+    """Drop every daily partition older than the retention window."""
+    cutoff = _utc_today() - timedelta(days=retention_days)
+    dropped = []
+    for name, day in await list_partitions(conn):
+        if day is not None and day < cutoff:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    # The default partition is expected to stay (nearly) empty
+    await conn.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff"),
+        {"cutoff": _day_bounds(cutoff)[0]}
+    )
+    return dropped
+
+
+async def maintain(engine) -> Dict[str, Any]:
+    """Pre-create upcoming partitions and apply the retention policy.
+
+    Each day's partition gets its own transaction, and retention another,
+    so one partition that can't be created neither undoes the others nor
+    stops expired partitions from being dropped.
+    """
+    async with engine.connect() as conn:
+        partitioned = await is_partitioned(conn)
+    if not partitioned:
+        print(
+            f"{PARENT} is not partitioned; run "
+            "'python -m app.core.partitions migrate' to convert it"
+        )
+        return {"partitioned": False}
+
+    created: List[str] = []
+    failed: List[str] = []
+    start = _utc_today() - timedelta(days=1)
+    for offset in range(settings.METRICS_PARTITION_PREMAKE_DAYS + 2):
+        day = start + timedelta(days=offset)
+        try:
+            async with engine.begin() as conn:
+                created += await create_partitions(conn, day, 1)
+        except Exception as e:
+            failed.append(partition_name(day))
+            print(f"Partition maintenance: could not create {partition_name(day)}: {e}")
+    async with engine.begin() as conn:
+        dropped = await drop_expired(conn, settings.METRICS_RETENTION_DAYS)
+    return {"partitioned": True, "created": created, "dropped": dropped, "failed": failed}
+
+
+async def migrate(engine) -> Dict[str, Any]:
+    """Convert an existing heap ``network_metrics`` into a partitioned table.
+
+    The old table is renamed to ``network_metrics_legacy`` and kept after
+    its rows are copied, so it can be checked and dropped by hand.
+    """
+    if not settings.METRICS_PARTITIONING:
+        # The model only declares the partitioned layout when this is on
+        return {"migrated": False, "reason": "METRICS_PARTITIONING is off"}
+    async with engine.begin() as conn:
+        if await is_partitioned(conn):
+            return {"migrated": False, "reason": "already partitioned"}
+
+        # Free the names the new table, its indexes and sequence will use
+        await conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {LEGACY_TABLE}"))
+        indexes = await conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :name"
+        ), {"name": LEGACY_TABLE})
+        for index_name in indexes.scalars().all():
+            await conn.execute(text(
+                f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"'
+            ))
+        await conn.execute(text(
+            f"ALTER SEQUENCE IF EXISTS {PARENT}_id_seq RENAME TO {LEGACY_TABLE}_id_seq"
+        ))
+
+        from ..models import NetworkMetric
+        await conn.run_sync(NetworkMetric.__table__.create)
+        await conn.run_sync(create_missing_indexes)
+
+        bounds = await conn.execute(text(
+            f"SELECT min(timestamp), max(timestamp) FROM {LEGACY_TABLE}"
+        ))
+        oldest, newest = bounds.one()
+        today = _utc_today()
+        retention_start = today - timedelta(days=settings.METRICS_RETENTION_DAYS)
+        start = max(oldest.date(), retention_start) if oldest else today
+        end = max(newest.date() if newest else today, today)
+        await create_partitions(
+            conn,
+            start,
+            (end - start).days + settings.METRICS_PARTITION_PREMAKE_DAYS + 1
+        )
+
+        copied = await conn.execute(text(
+            f"INSERT INTO {PARENT} ({COLUMNS})"
+            f" SELECT id, device_id, coalesce(timestamp, now()), metric_type,"
+            f" value, unit, metadata FROM {LEGACY_TABLE}"
+        ))
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{PARENT}', 'id'),"
+            f" coalesce((SELECT max(id) FROM {PARENT}), 0) + 1, false)"
+        ))
+    return {"migrated": True, "rows": copied.rowcount, "legacy_table": LEGACY_TABLE}
+
+
+class PartitionMaintainer:
+    """Runs partition maintenance at startup and then periodically."""
+
+    def __init__(self, engine, interval: int = 3600):
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            # First pass inline so today's partition exists before any insert
+            await self.run_once()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self):
+        try:
+            result = await maintain(self.engine)
+            if result.get("created") or result.get("dropped") or result.get("failed"):
+                print(f"Partition maintenance: {result}")
+        except Exception as e:
+            print(f"Partition maintenance error: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+
+async def _run_command(command: str):
+    from .database import engine
+    try:
+        if command == "maintain":
+            print(await maintain(engine))
+        elif command == "migrate":
+            print(await migrate(engine))
+        elif command == "list":
+            async with engine.connect() as conn:
+                for name, _ in await list_partitions(conn):
+                    print(name)
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage network_metrics partitions")
+    parser.add_argument("command", choices=["maintain", "migrate", "list"])
+    args = parser.parse_args(argv)
+    asyncio.run(_run_command(args.command))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""On-demand cProfile capture for individual HTTP requests.
+
+``ProfilingMiddleware`` is only added to the app when
+``PROFILING_ENABLED`` is set, so it costs nothing otherwise. A request is
+profiled when it carries ``X-Profile-Token`` matching ``PROFILING_TOKEN``,
+or at random with probability ``PROFILING_SAMPLE_RATE``. Profiled
+responses carry an ``X-Profile-Id`` header; the profile is then readable
+at ``/api/v1/internal/profiles/{id}`` with the same ``X-Profile-Token``.
+
+cProfile hooks the whole thread, so while a request is being profiled
+anything else the event loop runs shows up in its profile too, and only
+one request is profiled at a time.
+"""
+import cProfile
+import hmac
+import io
+import marshal
+import pstats
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from .config import settings
+
+PROFILE_HEADER = b"x-profile-token"
+
+
+class CapturedProfile:
+    def __init__(self, method: str, path: str, profile: cProfile.Profile):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.profile = profile
+        self.status: Optional[int] = None
+        self.duration_ms = 0.0
+        self.captured_at = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "captured_at": self.captured_at
+        }
+
+    def text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def pstats_bytes(self) -> bytes:
+        # Same format as Stats.dump_stats, loadable with pstats.Stats(path)
+        return marshal.dumps(pstats.Stats(self.profile).stats)
+
+
+class ProfileStore:
+    """Ring buffer of the most recent request profiles."""
+
+    def __init__(self, keep: int = 20):
+        self.keep = keep
+        self._profiles: "OrderedDict[str, CapturedProfile]" = OrderedDict()
+
+    def add(self, captured: CapturedProfile):
+        self._profiles[captured.id] = captured
+        while len(self._profiles) > self.keep:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[CapturedProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [captured.summary() for captured in reversed(self._profiles.values())]
+
+
+class ProfilingMiddleware:
+    """Profiles selected HTTP requests into a ``ProfileStore``."""
+
+    def __init__(
+        self,
+        app,
+        store: "ProfileStore",
+        token: Optional[str] = None,
+        sample_rate: float = 0.0
+    ):
+        self.app = app
+        self.store = store
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        self._active = False
+
+    def _wanted(self, scope) -> bool:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        captured = CapturedProfile(scope["method"], scope["path"], cProfile.Profile())
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                captured.status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", captured.id.encode())
+                ]
+            await send(message)
+
+        self._active = True
+        started = time.perf_counter()
+        captured.profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            captured.profile.disable()
+            self._active = False
+            captured.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.store.add(captured)
+
+
+profile_store = ProfileStore(keep=settings.PROFILING_KEEP)
@@ -0,0 +1,128 @@
+"""Prometheus instrumentation for the FastAPI service.
+
+``PrometheusMiddleware`` is a plain ASGI middleware rather than a
+``BaseHTTPMiddleware``, which would add a task and a stream per request.
+Per request it does two ``perf_counter`` calls, one gauge inc/dec and one
+histogram observe on a cached label child. It times its own bookkeeping
+into ``http_middleware_overhead_seconds_total`` so the cost can be
+checked in production; divided by the sum of
+``http_request_duration_seconds_count`` it gives the mean per request.
+"""
+import time
+from typing import Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served"
+)
+MIDDLEWARE_OVERHEAD = Counter(
+    "http_middleware_overhead_seconds",
+    "Time spent in the Prometheus middleware's own bookkeeping"
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open metrics websocket connections"
+)
+COLLECTOR_POLL_DURATION = Histogram(
+    "collector_poll_duration_seconds",
+    "Time to poll one device over SSH",
+    ["device"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 30, 60)
+)
+
+# Requests that matched no route share one label value so scanners
+# probing random paths can't blow up the series count
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """Records latency and in-flight counts for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._children: Dict[Tuple[str, str, int], object] = {}
+
+    def _observer(self, method: str, route: str, status: int):
+        key = (method, route, status)
+        child = self._children.get(key)
+        if child is None:
+            # labels() takes a lock and builds a tuple; do it once per series
+            child = self._children[key] = REQUEST_LATENCY.labels(method, route, str(status))
+        return child
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        entered = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finished = time.perf_counter()
+            REQUESTS_IN_PROGRESS.dec()
+            # FastAPI's router stores the matched APIRoute in the scope
+            route = scope.get("route")
+            self._observer(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status
+            ).observe(finished - started)
+            MIDDLEWARE_OVERHEAD.inc((started - entered) + (time.perf_counter() - finished))
+
+
+class DatabasePoolCollector:
+    """Exposes pool and query stats from ``db_stats`` at scrape time."""
+
+    def collect(self):
+        from .database import engine
+        from .db_stats import db_stats
+        snapshot = db_stats.snapshot(engine.pool)
+
+        pool = GaugeMetricFamily("db_pool_connections", "Connection pool state", labels=["state"])
+        for state in ("size", "checked_out", "idle", "overflow"):
+            pool.add_metric([state], snapshot["pool"][state])
+        yield pool
+
+        waits = GaugeMetricFamily(
+            "db_pool_checkout_wait_ms",
+            "Connection checkout wait over recent checkouts",
+            labels=["stat"]
+        )
+        for stat in ("avg", "p50", "p95", "max"):
+            waits.add_metric([stat], snapshot["checkout_wait_ms"][stat])
+        yield waits
+
+        yield CounterMetricFamily("db_queries", "Statements executed", value=snapshot["queries"])
+
+
+REGISTRY.register(DatabasePoolCollector())
+
+
+def render_latest() -> Tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
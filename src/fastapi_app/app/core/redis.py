@@ -0,0 +1,30 @@
+from typing import Optional
+from .config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis-backed features fall back to in-process state
+    aioredis = None
+
+_client: Optional["aioredis.Redis"] = None
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Shared asyncio Redis client, or None when redis isn't installed."""
+    global _client
+    if aioredis is None:
+        return None
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, func, inspect, select, text
+from .database import Base, create_missing_indexes
+
+# Bump whenever a model gains a table, column or index, so the next boot
+# re-runs create_all and create_missing_indexes once
+SCHEMA_VERSION = 3
+
+# pg_advisory_xact_lock key serialising schema upgrades between workers
+SCHEMA_LOCK_KEY = 0x76616E64
+
+# Kept out of Base.metadata so create_all never has to look at it
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def current_version(sync_conn) -> Optional[int]:
+    if not inspect(sync_conn).has_table(schema_version.name):
+        return None
+    return sync_conn.execute(select(func.max(schema_version.c.version))).scalar()
+
+
+def _up_to_date(version: Optional[int]) -> bool:
+    if version is None or version < SCHEMA_VERSION:
+        return False
+    if version > SCHEMA_VERSION:
+        print(f"Database schema v{version} is newer than this build (v{SCHEMA_VERSION})")
+    return True
+
+
+def ensure_schema(sync_conn) -> bool:
+    """Create tables and indexes only when the stored version is behind.
+
+    Returns True when the schema was (re)applied. A database that is
+    already at or past ``SCHEMA_VERSION`` costs a single catalog lookup
+    and one SELECT instead of create_all's per-table reflection.
+
+    Several workers may boot against the same outdated database: the
+    upgrade runs under a transaction-scoped advisory lock and the version
+    is checked again once it is held, so only the first worker applies it.
+    """
+    version = current_version(sync_conn)
+    if _up_to_date(version):
+        return False
+    if sync_conn.dialect.name == "postgresql":
+        sync_conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        version = current_version(sync_conn)
+        if _up_to_date(version):
+            return False
+
+    Base.metadata.create_all(sync_conn)
+    create_missing_indexes(sync_conn)
+    _metadata.create_all(sync_conn)
+    sync_conn.execute(schema_version.insert().values(
+        version=SCHEMA_VERSION,
+        applied_at=datetime.now(timezone.utc)
+    ))
+    print(f"Database schema applied: v{version or 0} -> v{SCHEMA_VERSION}")
+    return True
@@ -0,0 +1,50 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+
+class StartupTimer:
+    """Wall-clock time spent in each startup phase, in the order they ran.
+
+    Created when ``app.main`` starts importing, so the first ``mark`` covers
+    module imports and later phases come from the lifespan.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.completed = False
+
+    def mark(self, name: str):
+        """Record everything since the previous phase as ``name``."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def finish(self):
+        self.completed = True
+        print("Startup: " + ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases
+        ) + f" (total {(self._last - self.started) * 1000:.0f}ms)")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "total_ms": round((self._last - self.started) * 1000, 1),
+            "phases": [
+                {"name": name, "ms": round(seconds * 1000, 1)}
+                for name, seconds in self.phases
+            ]
+        }
+
+
+startup_timer = StartupTimer()
@@ -1,19 +1,55 @@
-from fastapi import FastAPI
+from .core.startup import startup_timer
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
 from .api import router as api_router
+from .api.endpoints.websocket import metrics_collector, metrics_producer
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import engine
+from .core.partitions import PartitionMaintainer
+from .core.redis import close_redis
+from .core.schema import ensure_schema
+from .services.device_inventory import device_inventory
+from .services.device_status import device_status
+from .services.local_sampler import local_sampler
+from .services.metric_writer import metric_writer
+
+partition_maintainer = PartitionMaintainer(
+    engine,
+    interval=settings.PARTITION_MAINTENANCE_INTERVAL
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    with startup_timer.phase("schema_check"):
+        async with engine.begin() as conn:
+            await conn.run_sync(ensure_schema)
+    with startup_timer.phase("device_inventory"):
+        try:
+            await device_inventory.load()
+        except Exception as e:
+            print(f"Device inventory load error: {e}")
+    if settings.METRICS_PARTITIONING:
+        with startup_timer.phase("partition_maintenance"):
+            await partition_maintainer.start()
+    with startup_timer.phase("background_tasks"):
+        await local_sampler.start()
+        await metric_writer.start()
+        await metrics_producer.start()
+        await device_status.start()
+    startup_timer.finish()
     yield
     # Shutdown
+    await device_status.stop()
+    await metrics_producer.stop()
+    await metric_writer.stop()
+    await local_sampler.stop()
+    await partition_maintainer.stop()
+    await close_redis()
+    await metrics_collector.close()
     await engine.dispose()
 
 
@@ -33,9 +69,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROMETHEUS_ENABLED:
+    from .core.prometheus import PrometheusMiddleware, render_latest
+
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        body, content_type = render_latest()
+        return Response(content=body, media_type=content_type)
+
+if settings.PROFILING_ENABLED:
+    from .core.profiling import ProfilingMiddleware, profile_store
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        token=settings.PROFILING_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE
+    )
+
 # Include routers
 app.include_router(api_router, prefix="/api/v1")
 
+startup_timer.mark("imports")
+
 
 @app.get("/")
 async def root():
@@ -1,19 +1,60 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from ..core.config import settings
 from ..core.database import Base
 
 
 class NetworkMetric(Base):
     __tablename__ = "network_metrics"
+    # Daily range partitions on timestamp, managed by core/partitions.py
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (timestamp)"}
+        if settings.METRICS_PARTITIONING else {}
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    # Postgres requires the partition key in the primary key, so the key is
+    # (id, timestamp) only when partitioned. Flipping METRICS_PARTITIONING
+    # never alters an existing table: a heap table is converted with
+    # ``python -m app.core.partitions migrate``, and a partitioned one keeps
+    # its composite key.
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     device_id = Column(Integer, ForeignKey("devices.id"), nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(
+        DateTime(timezone=True),
+        primary_key=settings.METRICS_PARTITIONING,
+        nullable=False,
+        server_default=func.now()
+    )
     metric_type = Column(String, nullable=False)  # bandwidth, latency, packet_loss
     value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)  # mbps, ms, percent
-    metadata = Column(JSON, default={})
+    # "metadata" is reserved on declarative classes; the column keeps its name
+    metadata_ = Column("metadata", JSON, default={})
     
     # Relationships
-    device = relationship("Device", backref="metrics")
\ No newline at end of file
+    device = relationship("Device", backref="metrics")
+
+
+# Serves "latest value per device and metric type" lookups with a single
+# backwards index scan per group
+Index(
+    "ix_network_metrics_device_type_ts",
+    NetworkMetric.device_id,
+    NetworkMetric.metric_type,
+    NetworkMetric.timestamp.desc(),
+)
+
+# Keyset pagination of /metrics/ orders and seeks on (timestamp, id); these
+# let both unfiltered and per-device pages start with an index seek
+Index(
+    "ix_network_metrics_ts_id",
+    NetworkMetric.timestamp.desc(),
+    NetworkMetric.id.desc(),
+)
+Index(
+    "ix_network_metrics_device_ts_id",
+    NetworkMetric.device_id,
+    NetworkMetric.timestamp.desc(),
+    NetworkMetric.id.desc(),
+)
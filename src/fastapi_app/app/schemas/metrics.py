@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
@@ -15,9 +15,32 @@ class MetricCreate(MetricBase):
     pass
 
 
+class MetricBatchItem(MetricBase):
+    # Optional so agents and backfills can supply the sample time
+    timestamp: Optional[datetime] = None
+
+
+class MetricBatchChunkResult(BaseModel):
+    chunk: int
+    accepted: int
+    rejected: int
+    errors: List[Dict[str, Any]] = []
+
+
+class MetricBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    chunks: List[MetricBatchChunkResult]
+
+
 class MetricResponse(MetricBase):
     id: int
     timestamp: datetime
+    # The ORM attribute is metadata_ (see models/metrics.py)
+    metadata: Optional[Dict[str, Any]] = Field(
+        default={},
+        validation_alias=AliasChoices("metadata_", "metadata")
+    )
     
     class Config:
         from_attributes = True
\ No newline at end of file
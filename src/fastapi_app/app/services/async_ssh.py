@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+import asyncssh
+
+
+class AsyncSSHPool:
+    """Native asyncio SSH backend with persistent per-device connections.
+
+    Every command runs under a fleet-wide semaphore and a per-device timeout
+    that covers connecting and executing, so one event loop can poll hundreds
+    of devices without a thread per device.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        connect_timeout: int = 10,
+        command_timeout: int = 15,
+        keepalive_interval: int = 30,
+        idle_timeout: int = 300
+    ):
+        self.connect_timeout = connect_timeout
+        self.command_timeout = command_timeout
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._connections: Dict[Tuple[str, int, str], Any] = {}
+        self._last_used: Dict[Tuple[str, int, str], float] = {}
+        self._connect_locks: Dict[Tuple[str, int, str], asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(device: Dict[str, Any]) -> Tuple[str, int, str]:
+        return (device['host'], int(device.get('port', 22)), device['username'])
+
+    async def _connect(self, device: Dict[str, Any]):
+        return await asyncssh.connect(
+            device['host'],
+            port=int(device.get('port', 22)),
+            username=device['username'],
+            password=device['password'],
+            known_hosts=None,
+            connect_timeout=self.connect_timeout,
+            keepalive_interval=self.keepalive_interval
+        )
+
+    async def _get_connection(self, device: Dict[str, Any]):
+        key = self._key(device)
+        lock = self._connect_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            conn = self._connections.get(key)
+            if conn is not None and \
+                    time.monotonic() - self._last_used[key] > self.idle_timeout:
+                self._discard(key)
+                conn = None
+            if conn is None:
+                conn = await self._connect(device)
+                self._connections[key] = conn
+                self._last_used[key] = time.monotonic()
+            return conn
+
+    def _discard(self, key: Tuple[str, int, str]):
+        conn = self._connections.pop(key, None)
+        self._last_used.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    @staticmethod
+    async def _exec(conn, command: str):
+        result = await conn.run(command, check=False)
+        if result.exit_status is None:
+            # The channel closed without an exit status: the connection
+            # dropped mid-command and stdout is whatever arrived before.
+            raise ConnectionResetError("SSH connection closed before the command finished")
+        return result
+
+    async def _run(self, device: Dict[str, Any], command: str) -> str:
+        key = self._key(device)
+        reused = key in self._connections
+        conn = await self._get_connection(device)
+        try:
+            result = await self._exec(conn, command)
+        except (asyncssh.Error, OSError):
+            self._discard(key)
+            if not reused:
+                raise
+            # Stale pooled connection; reconnect once and retry.
+            conn = await self._get_connection(device)
+            try:
+                result = await self._exec(conn, command)
+            except (asyncssh.Error, OSError):
+                self._discard(key)
+                raise
+        self._last_used[key] = time.monotonic()
+        return result.stdout or ''
+
+    async def run(self, device: Dict[str, Any], command: str) -> str:
+        """Run ``command`` on ``device`` and return its stdout."""
+        async with self.semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._run(device, command),
+                    timeout=self.command_timeout
+                )
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # A half-finished exchange leaves the channel in an unknown
+                # state, so never hand it to the next poll.
+                self._discard(self._key(device))
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {'open_connections': len(self._connections)}
+
+    async def close_all(self):
+        """Close every pooled connection."""
+        connections = list(self._connections.values())
+        self._connections.clear()
+        self._last_used.clear()
+        for conn in connections:
+            conn.close()
+        for conn in connections:
+            await conn.wait_closed()
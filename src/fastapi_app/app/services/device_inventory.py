@@ -0,0 +1,125 @@
+import time
+from typing import Any, Dict, List, Set
+from sqlalchemy import select
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models import Device
+
+# netmiko device types that understand the Linux metrics probe
+LINUX_DEVICE_TYPES = {'linux'}
+
+
+def settings_devices() -> List[Dict[str, Any]]:
+    """Devices configured through Settings, used while the table is empty or unreadable."""
+    return [
+        {
+            'id': None,
+            'name': 'pi0',
+            'host': settings.PI0_HOST,
+            'port': 22,
+            'username': settings.PI0_USERNAME,
+            'password': settings.PI0_PASSWORD,
+            'device_type': 'linux'
+        },
+        {
+            'id': None,
+            'name': 'pi1',
+            'host': settings.PI1_HOST,
+            'port': 22,
+            'username': settings.PI1_USERNAME,
+            'password': settings.PI1_PASSWORD,
+            'device_type': 'linux'
+        },
+        {
+            'id': None,
+            'name': 'router',
+            'host': settings.ROUTER_HOST,
+            'port': 22,
+            'username': settings.ROUTER_USERNAME,
+            'password': settings.ROUTER_PASSWORD,
+            'device_type': settings.ROUTER_DEVICE_TYPE
+        }
+    ]
+
+
+class DeviceInventory:
+    """In-memory cache of active devices from the ``devices`` table.
+
+    The device endpoints push creates, updates and deletes in as they
+    happen; a periodic full reload picks up changes made by other workers
+    or directly in the database.
+    """
+
+    def __init__(self, refresh_interval: int = 60):
+        self.refresh_interval = refresh_interval
+        self._devices: Dict[int, Dict[str, Any]] = {}
+        # Every row id, active or not; empty until a load succeeds
+        self._row_ids: Set[int] = set()
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def _entry(device: Device) -> Dict[str, Any]:
+        return {
+            'id': device.id,
+            'name': device.name,
+            'host': device.ip_address,
+            'port': 22,
+            'username': device.username,
+            'password': device.password,
+            'device_type': device.device_type
+        }
+
+    async def load(self):
+        """Replace the cache with all active devices from the database."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Device))
+            devices = result.scalars().all()
+        self._devices = {
+            device.id: self._entry(device) for device in devices if device.is_active
+        }
+        self._row_ids = {device.id for device in devices}
+        self._loaded_at = time.monotonic()
+
+    async def refresh_if_stale(self):
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        try:
+            await self.load()
+        except Exception as e:
+            # Keep serving the last known inventory
+            self._loaded_at = time.monotonic()
+            print(f"Device inventory refresh error: {e}")
+
+    def upsert(self, device: Device):
+        """Apply a created or updated device row."""
+        self._row_ids.add(device.id)
+        if device.is_active:
+            self._devices[device.id] = self._entry(device)
+        else:
+            self._devices.pop(device.id, None)
+
+    def remove(self, device_id: int):
+        self._devices.pop(device_id, None)
+        self._row_ids.discard(device_id)
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """All active devices.
+
+        Falls back to Settings only while the table is empty or has never
+        been read; if every row is inactive, there is nothing to poll.
+        """
+        if self._row_ids:
+            return list(self._devices.values())
+        return settings_devices()
+
+    def collection_targets(self) -> List[Dict[str, Any]]:
+        """Devices the metrics collector can probe over SSH."""
+        return [
+            device for device in self.devices()
+            if device['device_type'] in LINUX_DEVICE_TYPES
+        ]
+
+
+device_inventory = DeviceInventory(
+    refresh_interval=settings.INVENTORY_REFRESH_INTERVAL
+)
@@ -0,0 +1,136 @@
+from typing import Any, Callable, Dict
+
+# Shell commands for each metric section, in probe order.
+PROBE_COMMANDS = {
+    'cpu': "top -bn1 | grep 'Cpu(s)'",
+    'memory': "free -m | grep Mem",
+    'disk': "df -h / | tail -1",
+    'temperature': "vcgencmd measure_temp 2>/dev/null || echo 'temp=0'",
+    'uptime': "uptime -s",
+}
+
+MARKER_PREFIX = '__VANDINE_'
+END_MARKER = f'{MARKER_PREFIX}END__'
+
+
+def section_marker(section: str) -> str:
+    return f'{MARKER_PREFIX}{section.upper()}__'
+
+
+def build_probe_command() -> str:
+    """Build one shell line that runs every section behind a delimiter."""
+    parts = []
+    for section, command in PROBE_COMMANDS.items():
+        parts.append(f"echo {section_marker(section)}")
+        parts.append(command)
+    parts.append(f"echo {END_MARKER}")
+    return '; '.join(parts)
+
+
+def split_sections(output: str) -> Dict[str, str]:
+    """Split composite probe output into per-section text.
+
+    Only lines consisting solely of a marker start a section, so the echoed
+    command line (which also contains the markers) is ignored.
+    """
+    markers = {section_marker(section): section for section in PROBE_COMMANDS}
+    sections: Dict[str, str] = {}
+    current = None
+    lines = []
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped in markers or stripped == END_MARKER:
+            if current:
+                sections[current] = '\n'.join(lines).strip()
+            current = markers.get(stripped)
+            lines = []
+        elif current:
+            lines.append(line)
+    if current:
+        sections[current] = '\n'.join(lines).strip()
+    return sections
+
+
+def probe_complete(output: str) -> bool:
+    """Whether composite probe output runs through to the end marker."""
+    return any(line.strip() == END_MARKER for line in output.splitlines())
+
+
+def parse_cpu(output: str) -> Dict[str, Any]:
+    """Parse ``top -bn1`` Cpu(s) line into cpu_percent."""
+    parts = output.split()
+    for i, part in enumerate(parts):
+        if 'id,' in part and i > 0:
+            idle = float(parts[i-1].replace('%', ''))
+            return {'cpu_percent': round(100 - idle, 2)}
+    return {}
+
+
+def parse_memory(output: str) -> Dict[str, Any]:
+    """Parse the ``free -m`` Mem line."""
+    parts = output.split()
+    if len(parts) >= 3:
+        total = float(parts[1])
+        used = float(parts[2])
+        return {
+            'memory_percent': round((used / total) * 100, 2),
+            'memory_mb': {'total': total, 'used': used}
+        }
+    return {}
+
+
+def parse_disk(output: str) -> Dict[str, Any]:
+    """Parse the ``df -h /`` row for the root filesystem."""
+    parts = output.split()
+    if len(parts) >= 5:
+        return {
+            'disk_percent': float(parts[4].replace('%', '')),
+            'disk_gb': {
+                'total': parts[1],
+                'used': parts[2],
+                'available': parts[3]
+            }
+        }
+    return {}
+
+
+def parse_temperature(output: str) -> Dict[str, Any]:
+    """Parse ``vcgencmd measure_temp`` output (temp=48.3'C)."""
+    if 'temp=' in output:
+        temp = output.split('=')[1].replace("'C", "").strip()
+        return {'temperature_c': float(temp)}
+    return {}
+
+
+def parse_uptime(output: str) -> Dict[str, Any]:
+    """Parse ``uptime -s`` boot timestamp."""
+    if output.strip():
+        return {'uptime': output.strip()}
+    return {}
+
+
+SECTION_PARSERS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    'cpu': parse_cpu,
+    'memory': parse_memory,
+    'disk': parse_disk,
+    'temperature': parse_temperature,
+    'uptime': parse_uptime,
+}
+
+
+def parse_section(section: str, output: str) -> Dict[str, Any]:
+    """Parse one section, tolerating malformed output."""
+    if not output:
+        return {}
+    try:
+        return SECTION_PARSERS[section](output)
+    except (ValueError, IndexError, ZeroDivisionError):
+        return {}
+
+
+def parse_probe_output(output: str) -> Dict[str, Any]:
+    """Parse every section of a composite probe into one metrics dict."""
+    metrics: Dict[str, Any] = {}
+    for section, text in split_sections(output).items():
+        metrics.update(parse_section(section, text))
+    return metrics
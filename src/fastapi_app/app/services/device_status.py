@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.config import settings
+from .device_inventory import DeviceInventory, device_inventory
+from .sweep import SweepEngine
+
+
+class DeviceStatusMonitor:
+    """Reachability of every known device, probed in the background.
+
+    A refresh sweeps all device hosts at once through the sweep engine, so
+    at most ``concurrency`` probes are in flight and offline devices cost
+    one ``timeout`` in total rather than one each. Readers get the cached
+    result and its age immediately; entries older than ``ttl`` are
+    flagged stale, which only happens if refreshes are failing.
+    """
+
+    def __init__(
+        self,
+        inventory: Optional[DeviceInventory] = None,
+        interval: float = 15,
+        ttl: float = 60,
+        concurrency: int = 64,
+        timeout: float = 2.0
+    ):
+        self.inventory = inventory or device_inventory
+        self.interval = interval
+        self.ttl = ttl
+        self.engine = SweepEngine(
+            concurrency=concurrency,
+            rate=settings.SWEEP_RATE_PPS,
+            timeout=timeout,
+            tcp_ports=settings.SWEEP_TCP_PORTS,
+            method=settings.SWEEP_METHOD
+        )
+        # host -> (checked at, monotonic; checked at, epoch; result)
+        self._status: Dict[str, Tuple[float, float, Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._refreshing):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refreshing = None
+
+    async def refresh(self):
+        """Probe every device host once and store the results."""
+        hosts = sorted({device['host'] for device in self.inventory.devices()})
+        if not hosts:
+            return
+        async for result in self.engine.sweep(hosts, include_down=True):
+            self._status[result['ip']] = (time.monotonic(), time.time(), result)
+        # Forget hosts whose devices were removed
+        for host in set(self._status) - set(hosts):
+            self._status.pop(host, None)
+
+    async def _refresh_logged(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Device status refresh error: {e}")
+
+    def _kick(self):
+        # Used when a reader finds an unprobed host between scheduled runs
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh_logged())
+
+    async def _run(self):
+        while True:
+            self._kick()
+            await asyncio.shield(self._refreshing)
+            await asyncio.sleep(self.interval)
+
+    def statuses(self) -> List[Dict[str, Any]]:
+        """Cached status of every device, without waiting on any probe."""
+        now = time.monotonic()
+        entries = []
+        unknown = False
+        for device in self.inventory.devices():
+            cached = self._status.get(device['host'])
+            entry = {
+                'name': device['name'],
+                'host': device['host'],
+            }
+            if cached is None:
+                unknown = True
+                entry.update({'status': 'unknown', 'age_seconds': None, 'checked_at': None})
+            else:
+                checked, checked_at, result = cached
+                age = now - checked
+                entry.update({
+                    'status': 'online' if result['status'] == 'up' else 'offline',
+                    'rtt_ms': result.get('rtt_ms'),
+                    'age_seconds': round(age, 1),
+                    'checked_at': checked_at,
+                    'stale': age > self.ttl
+                })
+            entries.append(entry)
+        if unknown:
+            self._kick()
+        return entries
+
+
+device_status = DeviceStatusMonitor(
+    interval=settings.DEVICE_STATUS_INTERVAL,
+    ttl=settings.DEVICE_STATUS_TTL,
+    concurrency=settings.DEVICE_STATUS_CONCURRENCY,
+    timeout=settings.DEVICE_STATUS_TIMEOUT
+)
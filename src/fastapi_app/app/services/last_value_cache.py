@@ -0,0 +1,152 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from ..core.config import settings
+from ..core.redis import get_redis
+
+# Writes a batch of (field, epoch, payload) triples into the value hash
+# (KEYS[1]) only where they are newer than what the timestamp hash
+# (KEYS[2]) already holds, so backfills never overwrite fresher values.
+_MIRROR_SCRIPT = """
+for i = 1, #ARGV, 3 do
+    local current = redis.call('HGET', KEYS[2], ARGV[i])
+    if not current or tonumber(current) < tonumber(ARGV[i + 1]) then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 2])
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+end
+return 0
+"""
+
+
+def _epoch(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class LastValueCache:
+    """Latest value per (device_id, metric_type), served from memory.
+
+    Every ingest path records into it, so realtime reads never touch the
+    database once warm. With ``redis_mirror`` enabled, writes are mirrored
+    into per-device Redis hashes, and local entries older than ``local_ttl``
+    seconds are re-read from there, so several uvicorn workers share one
+    view. Types the database has no rows for are remembered as misses for
+    ``miss_ttl`` seconds, until a write for them arrives.
+    """
+
+    def __init__(self, redis_mirror: bool = False, local_ttl: float = 1.0, miss_ttl: float = 10.0):
+        self.redis_mirror = redis_mirror
+        self.local_ttl = local_ttl
+        self.miss_ttl = miss_ttl
+        # (device_id, metric_type) -> (sample epoch, entry, stored at)
+        self._values: Dict[Tuple[int, str], Tuple[float, Dict[str, Any], float]] = {}
+        # (device_id, metric_type) -> monotonic expiry of a cached miss
+        self._misses: Dict[Tuple[int, str], float] = {}
+
+    @staticmethod
+    def _keys(device_id: int) -> List[str]:
+        return [f"lvc:{device_id}", f"lvc:{device_id}:ts"]
+
+    def _store(self, device_id: int, metric_type: str, epoch: float, entry: Dict[str, Any]) -> bool:
+        key = (device_id, metric_type)
+        current = self._values.get(key)
+        if current is not None and current[0] >= epoch:
+            return False
+        self._values[key] = (epoch, entry, time.monotonic())
+        return True
+
+    async def record(self, rows: Iterable[Mapping[str, Any]]):
+        """Record metric rows (device_id, metric_type, value, unit, timestamp)."""
+        mirrored: Dict[int, List[str]] = {}
+        for row in rows:
+            self._misses.pop((row["device_id"], row["metric_type"]), None)
+            timestamp = row["timestamp"]
+            epoch = _epoch(timestamp)
+            entry = {
+                "value": row["value"],
+                "unit": row["unit"],
+                "timestamp": timestamp
+            }
+            if self._store(row["device_id"], row["metric_type"], epoch, entry):
+                mirrored.setdefault(row["device_id"], []).extend([
+                    row["metric_type"],
+                    str(epoch),
+                    json.dumps({**entry, "timestamp": timestamp.isoformat()})
+                ])
+
+        redis = get_redis() if self.redis_mirror else None
+        if redis is None or not mirrored:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for device_id, args in mirrored.items():
+                    pipe.eval(_MIRROR_SCRIPT, 2, *self._keys(device_id), *args)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Last-value cache mirror error: {e}")
+
+    def record_misses(self, device_id: int, metric_types: Iterable[str]):
+        """Remember that the database has no rows for these types."""
+        expires = time.monotonic() + self.miss_ttl
+        for metric_type in metric_types:
+            self._misses[(device_id, metric_type)] = expires
+
+    async def get(
+        self,
+        device_id: int,
+        metric_types: List[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Return cached values for ``metric_types`` and the types still missing.
+
+        Types with a live cached miss are neither found nor missing.
+        """
+        redis = get_redis() if self.redis_mirror else None
+        now = time.monotonic()
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for metric_type in metric_types:
+            key = (device_id, metric_type)
+            if key in self._misses:
+                if self._misses[key] > now:
+                    continue
+                del self._misses[key]
+            cached = self._values.get(key)
+            if cached is not None:
+                found[metric_type] = cached[1]
+            # Another worker may hold something newer once the entry ages
+            if cached is None or (redis is not None and now - cached[2] > self.local_ttl):
+                missing.append(metric_type)
+
+        if redis is None or not missing:
+            return found, missing
+        try:
+            payloads = await redis.hmget(self._keys(device_id)[0], missing)
+        except Exception as e:
+            print(f"Last-value cache mirror error: {e}")
+            return found, [t for t in missing if t not in found]
+
+        still_missing = []
+        for metric_type, payload in zip(missing, payloads):
+            if payload is None:
+                if metric_type not in found:
+                    still_missing.append(metric_type)
+                continue
+            entry = json.loads(payload)
+            entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+            key = (device_id, metric_type)
+            if not self._store(device_id, metric_type, _epoch(entry["timestamp"]), entry):
+                # Local copy is as new as Redis; just mark it fresh again
+                epoch, local_entry, _ = self._values[key]
+                self._values[key] = (epoch, local_entry, now)
+            found[metric_type] = self._values[key][1]
+        return found, still_missing
+
+
+last_value_cache = LastValueCache(
+    redis_mirror=settings.LAST_VALUE_REDIS_MIRROR,
+    local_ttl=settings.LAST_VALUE_LOCAL_TTL,
+    miss_ttl=settings.LAST_VALUE_MISS_TTL
+)
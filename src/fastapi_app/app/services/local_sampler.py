@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from ..core.config import settings
+
+
+def _rates(current, previous, elapsed: float, fields) -> Dict[str, float]:
+    if current is None or previous is None or elapsed <= 0:
+        return {}
+    return {
+        f'{field}_per_sec': round(
+            (getattr(current, field) - getattr(previous, field)) / elapsed, 2
+        )
+        for field in fields
+    }
+
+
+class LocalSystemSampler:
+    """Keeps a rolling snapshot of local CPU, memory, disk and I/O counters.
+
+    A background task samples every ``interval`` seconds using only
+    non-blocking psutil calls (``cpu_percent(interval=None)`` measures since
+    the previous call), so readers get the latest snapshot in O(1) without
+    ever stalling the event loop.
+    """
+
+    NET_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv')
+    DISK_FIELDS = ('read_bytes', 'write_bytes', 'read_count', 'write_count')
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.snapshot: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_net = None
+        self._last_disk = None
+        self._last_time: Optional[float] = None
+
+    def sample(self):
+        import psutil
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+        disk_io = psutil.disk_io_counters()
+        elapsed = now - self._last_time if self._last_time else 0
+
+        self.snapshot = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_percent': psutil.disk_usage('/').percent,
+            'network_io': net._asdict() if net else {},
+            'network_rates': _rates(net, self._last_net, elapsed, self.NET_FIELDS),
+            'disk_io_rates': _rates(disk_io, self._last_disk, elapsed, self.DISK_FIELDS),
+            'sampled_at': time.time()
+        }
+        self._last_net = net
+        self._last_disk = disk_io
+        self._last_time = now
+
+    async def start(self):
+        if self._task is None:
+            import psutil
+            # Prime cpu_percent so the first real sample has a baseline
+            psutil.cpu_percent(interval=None)
+            self.sample()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Local sampler error: {e}")
+
+    def latest(self) -> Dict[str, Any]:
+        if not self.snapshot:
+            self.sample()
+        return self.snapshot
+
+
+local_sampler = LocalSystemSampler(interval=settings.LOCAL_SAMPLE_INTERVAL)
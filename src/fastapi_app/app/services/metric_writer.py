@@ -0,0 +1,170 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import insert
+from ..core.config import settings
+from ..core.database import engine
+from ..models import NetworkMetric
+from .device_inventory import device_inventory
+from .last_value_cache import last_value_cache
+
+# Collector fields persisted as network_metrics rows: field -> (type, unit)
+COLLECTED_FIELDS = {
+    'cpu_percent': ('cpu', 'percent'),
+    'memory_percent': ('memory', 'percent'),
+    'disk_percent': ('disk', 'percent'),
+    'temperature_c': ('temperature', 'celsius'),
+}
+
+
+def snapshot_rows(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turn a collector snapshot into network_metrics rows.
+
+    Devices without a database id (the Settings fallback) are skipped,
+    since every row needs a valid device foreign key.
+    """
+    ids = {device['name']: device['id'] for device in device_inventory.devices()}
+    timestamp = datetime.now(timezone.utc)
+    rows = []
+    for name, metrics in snapshot.get('data', {}).items():
+        device_id = ids.get(name)
+        if device_id is None or metrics.get('status') != 'online':
+            continue
+        for field, (metric_type, unit) in COLLECTED_FIELDS.items():
+            if field in metrics:
+                rows.append({
+                    'device_id': device_id,
+                    'timestamp': timestamp,
+                    'metric_type': metric_type,
+                    'value': float(metrics[field]),
+                    'unit': unit,
+                    'metadata': {'source': 'collector'}
+                })
+    return rows
+
+
+class MetricWriter:
+    """Bounded ingest queue written to network_metrics in batches.
+
+    Producers ``await submit(...)``, which blocks while the queue is full,
+    so a slow database pushes back on collection instead of growing memory.
+    The writer flushes when ``batch_size`` rows are waiting or
+    ``flush_interval`` seconds after the first row of a batch arrived,
+    using one multi-row INSERT per batch.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # Rows taken off the queue for the batch being assembled, so
+        # stop() can still write them if it cancels the writer mid-batch
+        self._pending: List[Dict[str, Any]] = []
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'failed': 0,
+            'batches': 0,
+            'queue_high_watermark': 0,
+            'last_batch_size': 0,
+            'last_flush_ms': 0.0,
+            'last_error': None,
+        }
+
+    async def submit(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            await self.queue.put(row)
+            self._stats['enqueued'] += 1
+        depth = self.queue.qsize()
+        if depth > self._stats['queue_high_watermark']:
+            self._stats['queue_high_watermark'] = depth
+
+    async def submit_snapshot(self, snapshot: Dict[str, Any]):
+        """Producer subscriber: persist a collector snapshot."""
+        rows = snapshot_rows(snapshot)
+        await last_value_cache.record(rows)
+        await self.submit(rows)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Drain whatever is still queued before shutdown
+        batch, self._pending = self._pending, []
+        await self._flush(batch)
+        while not self.queue.empty():
+            batch = []
+            while not self.queue.empty() and len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+            await self._flush(batch)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        batch = self._pending
+        batch.append(await self.queue.get())
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            # Take whatever is already queued without waiting
+            while not self.queue.empty() and len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+            if len(batch) >= self.batch_size:
+                break
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            self._pending = []
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(NetworkMetric.__table__).values(batch))
+            self._stats['written'] += len(batch)
+        except Exception as e:
+            self._stats['failed'] += len(batch)
+            self._stats['last_error'] = str(e)
+            print(f"Metric writer flush error: {e}")
+        self._stats['batches'] += 1
+        self._stats['last_batch_size'] = len(batch)
+        self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            **self._stats
+        }
+
+
+metric_writer = MetricWriter(
+    max_queue=settings.INGEST_QUEUE_SIZE,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL
+)
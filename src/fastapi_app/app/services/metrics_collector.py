@@ -1,42 +1,56 @@
 import asyncio
-from typing import Dict, List, Any
-from netmiko import ConnectHandler
-import psutil
+import time
+from typing import Dict, List, Any, Optional
 from ..core.config import settings
+from ..core.prometheus import COLLECTOR_POLL_DURATION
+from .ssh_pool import SSHSessionPool
+from .device_inventory import DeviceInventory, device_inventory
+from .local_sampler import local_sampler
+from .device_probe import (
+    PROBE_COMMANDS,
+    build_probe_command,
+    parse_probe_output,
+    parse_section,
+    probe_complete,
+)
 
 
 class MetricsCollector:
     """Service for collecting system and network metrics."""
     
-    def __init__(self):
-        self.devices = [
-            {
-                'name': 'pi0',
-                'host': settings.PI0_HOST,
-                'username': settings.PI0_USERNAME,
-                'password': settings.PI0_PASSWORD,
-                'device_type': 'linux'
-            },
-            {
-                'name': 'pi1',
-                'host': settings.PI1_HOST,
-                'username': settings.PI1_USERNAME,
-                'password': settings.PI1_PASSWORD,
-                'device_type': 'linux'
-            }
-        ]
+    def __init__(self, inventory: Optional[DeviceInventory] = None):
+        # Polling targets come from the devices table via the inventory
+        self.inventory = inventory or device_inventory
+        self.ssh_pool = SSHSessionPool(
+            connect_timeout=settings.SSH_CONNECT_TIMEOUT,
+            keepalive_interval=settings.SSH_KEEPALIVE_INTERVAL,
+            idle_timeout=settings.SSH_IDLE_TIMEOUT,
+            health_check_interval=settings.SSH_HEALTH_CHECK_INTERVAL
+        )
+        self.async_ssh = None
+        if settings.SSH_BACKEND == 'asyncssh':
+            from .async_ssh import AsyncSSHPool
+            self.async_ssh = AsyncSSHPool(
+                max_concurrency=settings.SSH_MAX_CONCURRENCY,
+                connect_timeout=settings.SSH_CONNECT_TIMEOUT,
+                command_timeout=settings.SSH_COMMAND_TIMEOUT,
+                keepalive_interval=settings.SSH_KEEPALIVE_INTERVAL,
+                idle_timeout=settings.SSH_IDLE_TIMEOUT
+            )
     
     async def collect_all_metrics(self) -> Dict[str, Any]:
         """Collect metrics from all configured devices."""
+        await self.inventory.refresh_if_stale()
+        devices = self.inventory.collection_targets()
         tasks = []
-        for device in self.devices:
+        for device in devices:
             task = asyncio.create_task(self.collect_device_metrics(device))
             tasks.append(task)
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         metrics = {}
-        for device, result in zip(self.devices, results):
+        for device, result in zip(devices, results):
             if isinstance(result, Exception):
                 metrics[device['name']] = {
                     'error': str(result),
@@ -49,7 +63,10 @@ class MetricsCollector:
     
     async def collect_device_metrics(self, device: Dict[str, str]) -> Dict[str, Any]:
         """Collect metrics from a single device via SSH."""
+        started = time.perf_counter()
         try:
+            if self.async_ssh is not None:
+                return await self._collect_metrics_async(device)
             # Run in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             metrics = await loop.run_in_executor(
@@ -58,74 +75,47 @@ class MetricsCollector:
                 device
             )
             return metrics
+        finally:
+            COLLECTOR_POLL_DURATION.labels(device['name']).observe(
+                time.perf_counter() - started
+            )
+    
+    async def _collect_metrics_async(self, device: Dict[str, str]) -> Dict[str, Any]:
+        """Collect metrics on the event loop through the asyncssh backend."""
+        metrics = {
+            'status': 'online',
+            'host': device['host']
+        }
+        try:
+            if settings.METRICS_PROBE_MODE == 'composite':
+                output = await self.async_ssh.run(device, build_probe_command())
+                metrics.update(self._parse_composite(output))
+            else:
+                for section, command in PROBE_COMMANDS.items():
+                    output = await self.async_ssh.run(device, command)
+                    metrics.update(parse_section(section, output))
+            return self._require_metrics(metrics)
+        except asyncio.TimeoutError:
+            return {
+                'status': 'offline',
+                'error': f"timed out after {settings.SSH_COMMAND_TIMEOUT}s",
+                'host': device['host']
+            }
         except Exception as e:
-            raise e
+            return {
+                'status': 'offline',
+                'error': str(e),
+                'host': device['host']
+            }
     
     def _collect_metrics_sync(self, device: Dict[str, str]) -> Dict[str, Any]:
         """Synchronous method to collect metrics via SSH."""
         try:
-            # Connect to device
-            connection = ConnectHandler(
-                device_type=device['device_type'],
-                host=device['host'],
-                username=device['username'],
-                password=device['password'],
-                timeout=10
+            # Reuse the device's pooled session instead of a fresh handshake
+            return self.ssh_pool.run(
+                device,
+                lambda connection: self._read_metrics(connection, device)
             )
-            
-            # Collect various metrics
-            metrics = {
-                'status': 'online',
-                'host': device['host']
-            }
-            
-            # CPU usage
-            cpu_output = connection.send_command("top -bn1 | grep 'Cpu(s)'")
-            if cpu_output:
-                # Parse CPU usage
-                parts = cpu_output.split()
-                for i, part in enumerate(parts):
-                    if 'id,' in part and i > 0:
-                        idle = float(parts[i-1].replace('%', ''))
-                        metrics['cpu_percent'] = round(100 - idle, 2)
-                        break
-            
-            # Memory usage
-            mem_output = connection.send_command("free -m | grep Mem")
-            if mem_output:
-                parts = mem_output.split()
-                if len(parts) >= 3:
-                    total = float(parts[1])
-                    used = float(parts[2])
-                    metrics['memory_percent'] = round((used / total) * 100, 2)
-                    metrics['memory_mb'] = {'total': total, 'used': used}
-            
-            # Disk usage
-            disk_output = connection.send_command("df -h / | tail -1")
-            if disk_output:
-                parts = disk_output.split()
-                if len(parts) >= 5:
-                    metrics['disk_percent'] = float(parts[4].replace('%', ''))
-                    metrics['disk_gb'] = {
-                        'total': parts[1],
-                        'used': parts[2],
-                        'available': parts[3]
-                    }
-            
-            # Temperature (Raspberry Pi specific)
-            temp_output = connection.send_command("vcgencmd measure_temp 2>/dev/null || echo 'temp=0'")
-            if temp_output and 'temp=' in temp_output:
-                temp = temp_output.split('=')[1].replace("'C", "")
-                metrics['temperature_c'] = float(temp)
-            
-            # Uptime
-            uptime_output = connection.send_command("uptime -s")
-            if uptime_output:
-                metrics['uptime'] = uptime_output.strip()
-            
-            connection.disconnect()
-            return metrics
-            
         except Exception as e:
             return {
                 'status': 'offline',
@@ -133,11 +123,47 @@ class MetricsCollector:
                 'host': device['host']
             }
     
+    def _read_metrics(self, connection, device: Dict[str, str]) -> Dict[str, Any]:
+        """Read metrics over an already authenticated connection."""
+        # Collect various metrics
+        metrics = {
+            'status': 'online',
+            'host': device['host']
+        }
+        
+        if settings.METRICS_PROBE_MODE == 'composite':
+            # One round trip: every section behind a delimiter in one buffer
+            output = connection.send_command(build_probe_command())
+            metrics.update(self._parse_composite(output))
+        else:
+            for section, command in PROBE_COMMANDS.items():
+                output = connection.send_command(command)
+                metrics.update(parse_section(section, output))
+        
+        return self._require_metrics(metrics)
+    
+    @staticmethod
+    def _parse_composite(output: str) -> Dict[str, Any]:
+        # Cut-off output would otherwise pass as a device with fewer metrics
+        if not probe_complete(output):
+            raise RuntimeError("probe output ended before the end marker")
+        return parse_probe_output(output)
+    
+    @staticmethod
+    def _require_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+        if metrics.keys() <= {'status', 'host'}:
+            raise RuntimeError("no metrics parsed from probe output")
+        return metrics
+    
+    async def close(self):
+        """Disconnect all pooled SSH sessions."""
+        # netmiko's disconnect blocks on the far end, so keep it off the loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.ssh_pool.close_all)
+        if self.async_ssh is not None:
+            await self.async_ssh.close_all()
+    
     async def collect_local_metrics(self) -> Dict[str, Any]:
         """Collect metrics from the local system."""
-        return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'disk_percent': psutil.disk_usage('/').percent,
-            'network_io': psutil.net_io_counters()._asdict() if psutil.net_io_counters() else {}
-        }
\ No newline at end of file
+        # Served from the background sampler; never blocks the event loop
+        return local_sampler.latest()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+Subscriber = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class MetricsProducer:
+    """Single background task that polls the fleet on a fixed interval.
+
+    Each snapshot is collected once and handed to every subscriber, so
+    device load does not depend on how many consumers are listening.
+    """
+
+    def __init__(self, collector, interval: float = 5):
+        self.collector = collector
+        self.interval = interval
+        self.subscribers: List[Subscriber] = []
+        self.latest: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: Subscriber):
+        self.subscribers.append(callback)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _publish(self, snapshot: Dict[str, Any]):
+        for callback in self.subscribers:
+            try:
+                await callback(snapshot)
+            except Exception as e:
+                print(f"Metrics subscriber error: {e}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                metrics = await self.collector.collect_all_metrics()
+                self.latest = {
+                    "type": "metrics_update",
+                    "data": metrics
+                }
+                await self._publish(self.latest)
+            except Exception as e:
+                print(f"Metrics producer error: {e}")
+            # Keep a steady cadence regardless of how long collection took
+            elapsed = loop.time() - started
+            await asyncio.sleep(max(0, self.interval - elapsed))
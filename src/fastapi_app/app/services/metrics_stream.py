@@ -0,0 +1,114 @@
+import json
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # MessagePack frames are optional
+    msgpack = None
+
+# Websocket subprotocols. Clients that don't ask for one get full JSON
+# snapshots every cycle, exactly as before.
+PROTOCOL_FULL_JSON = "vandine.metrics.v1"
+PROTOCOL_DELTA_JSON = "vandine.delta.v1+json"
+PROTOCOL_DELTA_MSGPACK = "vandine.delta.v1+msgpack"
+
+
+def supported_protocols() -> List[str]:
+    protocols = [PROTOCOL_DELTA_JSON, PROTOCOL_FULL_JSON]
+    if msgpack is not None:
+        protocols.insert(0, PROTOCOL_DELTA_MSGPACK)
+    return protocols
+
+
+def select_subprotocol(offered: List[str]) -> Optional[str]:
+    """Pick the first protocol the client offered that we can speak."""
+    supported = supported_protocols()
+    for protocol in offered:
+        if protocol in supported:
+            return protocol
+    return None
+
+
+def merge_patch(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Field-level diff of two snapshots as an RFC 7386 JSON merge patch.
+
+    Nested dicts are diffed recursively, removed keys map to ``None`` and
+    any other changed value (including lists) is replaced wholesale.
+    """
+    patch: Dict[str, Any] = {}
+    for key in previous:
+        if key not in current:
+            patch[key] = None
+    for key, value in current.items():
+        if key not in previous:
+            patch[key] = value
+            continue
+        old = previous[key]
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = merge_patch(old, value)
+            if nested:
+                patch[key] = nested
+        elif old != value:
+            patch[key] = value
+    return patch
+
+
+def _encode(payload: Dict[str, Any], binary: bool) -> Union[str, bytes]:
+    if binary:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload, separators=(',', ':'))
+
+
+class SnapshotFrames:
+    """Every wire encoding of one snapshot, each built at most once.
+
+    Encodings are created lazily on first request, so a broadcast only pays
+    for the formats that connected clients actually negotiated.
+    """
+
+    def __init__(
+        self,
+        seq: int,
+        snapshot: Dict[str, Any],
+        previous: Optional[Dict[str, Any]] = None
+    ):
+        self.seq = seq
+        self.snapshot = snapshot
+        self.previous = previous
+        self._patch: Optional[Dict[str, Any]] = None
+        self._cache: Dict[Any, Union[str, bytes]] = {}
+
+    @property
+    def patch(self) -> Dict[str, Any]:
+        if self._patch is None:
+            self._patch = merge_patch(
+                (self.previous or {}).get("data", {}),
+                self.snapshot.get("data", {})
+            )
+        return self._patch
+
+    def full(self) -> str:
+        if "full" not in self._cache:
+            self._cache["full"] = json.dumps(self.snapshot)
+        return self._cache["full"]
+
+    def keyframe(self, binary: bool) -> Union[str, bytes]:
+        key = ("keyframe", binary)
+        if key not in self._cache:
+            self._cache[key] = _encode({
+                "type": "keyframe",
+                "seq": self.seq,
+                "data": self.snapshot.get("data", {})
+            }, binary)
+        return self._cache[key]
+
+    def delta(self, binary: bool) -> Union[str, bytes]:
+        key = ("delta", binary)
+        if key not in self._cache:
+            self._cache[key] = _encode({
+                "type": "delta",
+                "seq": self.seq,
+                "base": self.seq - 1,
+                "patch": self.patch
+            }, binary)
+        return self._cache[key]
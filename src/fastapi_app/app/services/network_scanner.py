@@ -1,47 +1,129 @@
 import asyncio
-import subprocess
-from typing import List, Dict
 import ipaddress
-import aiohttp
+import time
+from typing import Any, AsyncIterator, List, Dict, Optional
+from ..core.config import settings
+from .sweep import SweepEngine, count_targets, expand_targets
+
+PRIVATE_SUBNETS = ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]
+
+
+class ScanLimitError(Exception):
+    """Raised when the streamed scan limit is already reached."""
 
 
 class NetworkScanner:
     """Service for network scanning operations."""
     
+    def __init__(
+        self,
+        engine: Optional[SweepEngine] = None,
+        allowed_subnets: Optional[List[str]] = None,
+        max_streams: Optional[int] = None
+    ):
+        self.engine = engine or SweepEngine(
+            concurrency=settings.SWEEP_CONCURRENCY,
+            rate=settings.SWEEP_RATE_PPS,
+            timeout=settings.SWEEP_TIMEOUT,
+            tcp_ports=settings.SWEEP_TCP_PORTS,
+            method=settings.SWEEP_METHOD,
+            max_hosts=settings.SWEEP_MAX_HOSTS
+        )
+        self.allowed_subnets = [
+            ipaddress.ip_network(subnet, strict=False)
+            for subnet in allowed_subnets or settings.SCAN_ALLOWED_SUBNETS or PRIVATE_SUBNETS
+        ]
+        self.max_streams = max_streams or settings.SCAN_MAX_CONCURRENT_STREAMS
+        self.active_streams = 0
+    
     async def scan_subnet(self, subnet: str) -> List[Dict[str, str]]:
-        """Scan a subnet for active hosts using nmap."""
+        """Scan a subnet for active hosts with the in-process sweep engine."""
         try:
-            # Run nmap scan asynchronously
-            proc = await asyncio.create_subprocess_exec(
-                'nmap', '-sn', subnet, '-oG', '-',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await proc.communicate()
-            
-            if proc.returncode != 0:
-                print(f"Nmap error: {stderr.decode()}")
-                return []
-            
-            # Parse nmap output
-            active_hosts = []
-            for line in stdout.decode().split('\n'):
-                if 'Up' in line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        ip = parts[1]
-                        active_hosts.append({
-                            'ip': ip,
-                            'status': 'up'
-                        })
-            
-            return active_hosts
-            
+            return await self.engine.scan(subnet)
         except Exception as e:
             print(f"Network scan error: {e}")
             return []
     
+    def validate_subnet(self, subnet: str) -> int:
+        """Host count for ``subnet``; raises ValueError for a bad target.
+
+        Targets outside the allowed subnets are rejected too, so clients
+        can't point the sweep at arbitrary networks.
+        """
+        expand_targets(subnet, self.engine.max_hosts)
+        network = ipaddress.ip_network(subnet, strict=False)
+        if not any(
+            allowed.version == 4 and network.subnet_of(allowed)
+            for allowed in self.allowed_subnets
+        ):
+            raise ValueError(f"{network} is outside the subnets allowed for scanning")
+        return count_targets(subnet)
+    
+    def streams_full(self) -> bool:
+        return self.active_streams >= self.max_streams
+    
+    async def scan_events(
+        self,
+        subnet: str,
+        progress_interval: float = 0.25
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a sweep as ``host``, ``progress`` and ``summary`` events.
+
+        Each up host is emitted as soon as it answers; progress goes out at
+        most every ``progress_interval`` seconds and once at the end.
+        """
+        total = self.validate_subnet(subnet)
+        # Claimed when the stream starts, so an unconsumed generator holds
+        # no slot; callers check streams_full() first to fail early
+        if self.streams_full():
+            raise ScanLimitError(f"{self.max_streams} streamed scans already running")
+        self.active_streams += 1
+        started = time.perf_counter()
+        last_progress = started
+        probed = 0
+        found = 0
+        
+        def progress() -> Dict[str, Any]:
+            return {
+                'event': 'progress',
+                'data': {
+                    'probed': probed,
+                    'total': total,
+                    'found': found,
+                    'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+                }
+            }
+        
+        sweep = self.engine.sweep(subnet, include_down=True)
+        try:
+            async for result in sweep:
+                probed += 1
+                if result['status'] == 'up':
+                    found += 1
+                    yield {'event': 'host', 'data': result}
+                now = time.perf_counter()
+                if now - last_progress >= progress_interval:
+                    last_progress = now
+                    yield progress()
+        finally:
+            # Stop the probes as soon as the consumer goes away, not
+            # whenever the abandoned sweep is garbage collected
+            try:
+                await sweep.aclose()
+            finally:
+                self.active_streams -= 1
+        
+        yield progress()
+        yield {
+            'event': 'summary',
+            'data': {
+                'subnet': subnet,
+                'active_hosts': found,
+                'probed': probed,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+        }
+    
     async def is_device_reachable(self, host: str, timeout: int = 3) -> bool:
         """Check if a device is reachable using ping."""
         try:
@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+def transport_errors() -> Tuple[type, ...]:
+    """Exceptions that mean the session itself is broken.
+
+    Anything else raised by a poll (a parse bug, say) leaves the session
+    usable, so it is neither discarded nor retried.
+    """
+    # Imported here for the same reason as ConnectHandler in _open
+    from netmiko.exceptions import NetmikoTimeoutException, ReadTimeout
+    from paramiko.ssh_exception import SSHException
+    return (OSError, EOFError, SSHException, NetmikoTimeoutException, ReadTimeout)
+
+
+class PooledSession:
+    """An authenticated netmiko connection plus its bookkeeping."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+
+
+class SSHSessionPool:
+    """Keeps one persistent SSH session per device and reuses it across polls.
+
+    Sessions are opened on first use, kept alive with transport keepalives,
+    health-checked before reuse and evicted once idle for ``idle_timeout``
+    seconds. A command that fails with a transport error on a reused
+    session is retried once on a fresh connection, so a dropped channel
+    costs one reconnect, not a poll.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: int = 10,
+        keepalive_interval: int = 30,
+        idle_timeout: int = 300,
+        health_check_interval: int = 60
+    ):
+        self.connect_timeout = connect_timeout
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._sessions: Dict[Tuple[str, int, str], PooledSession] = {}
+        self._device_locks: Dict[Tuple[str, int, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(device: Dict[str, Any]) -> Tuple[str, int, str]:
+        return (device['host'], int(device.get('port', 22)), device['username'])
+
+    def _device_lock(self, key: Tuple[str, int, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._device_locks.get(key)
+            if lock is None:
+                lock = self._device_locks[key] = threading.Lock()
+            return lock
+
+    def _open(self, device: Dict[str, Any]) -> PooledSession:
+        # netmiko pulls in paramiko and friends; load it on the first poll
+        # rather than at API startup
+        from netmiko import ConnectHandler
+        connection = ConnectHandler(
+            device_type=device['device_type'],
+            host=device['host'],
+            port=int(device.get('port', 22)),
+            username=device['username'],
+            password=device['password'],
+            timeout=self.connect_timeout,
+            keepalive=self.keepalive_interval
+        )
+        return PooledSession(connection)
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        now = time.monotonic()
+        if now - session.last_used > self.idle_timeout:
+            return False
+        if now - session.last_checked < self.health_check_interval:
+            return True
+        try:
+            alive = session.connection.is_alive()
+        except Exception:
+            alive = False
+        session.last_checked = now
+        return alive
+
+    @staticmethod
+    def _disconnect(session: PooledSession):
+        try:
+            session.connection.disconnect()
+        except Exception:
+            pass
+
+    def _discard(self, key: Tuple[str, int, str]):
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session:
+            self._disconnect(session)
+
+    def run(self, device: Dict[str, Any], func: Callable[[Any], Any]) -> Any:
+        """Run ``func(connection)`` on the pooled session for ``device``."""
+        self.evict_idle()
+        key = self._key(device)
+        with self._device_lock(key):
+            with self._lock:
+                session = self._sessions.get(key)
+            if session and not self._is_healthy(session):
+                self._discard(key)
+                session = None
+
+            reused = session is not None
+            if session is None:
+                session = self._open(device)
+                with self._lock:
+                    self._sessions[key] = session
+
+            errors = transport_errors()
+            try:
+                result = func(session.connection)
+            except errors:
+                self._discard(key)
+                if not reused:
+                    raise
+                # The cached channel went stale between health checks;
+                # reconnect once and retry on a fresh session.
+                session = self._open(device)
+                with self._lock:
+                    self._sessions[key] = session
+                try:
+                    result = func(session.connection)
+                except errors:
+                    self._discard(key)
+                    raise
+
+            session.last_used = time.monotonic()
+            return result
+
+    def evict_idle(self):
+        """Close sessions that have not been used within ``idle_timeout``."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key for key, session in self._sessions.items()
+                if now - session.last_used > self.idle_timeout
+            ]
+        for key in expired:
+            lock = self._device_lock(key)
+            # Skip sessions currently in use; they are not idle.
+            if lock.acquire(blocking=False):
+                try:
+                    with self._lock:
+                        session = self._sessions.get(key)
+                    if session and now - session.last_used > self.idle_timeout:
+                        self._discard(key)
+                finally:
+                    lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'open_sessions': len(self._sessions),
+                'sessions': [
+                    {
+                        'host': key[0],
+                        'port': key[1],
+                        'age_seconds': round(now - session.created_at, 1),
+                        'idle_seconds': round(now - session.last_used, 1)
+                    }
+                    for key, session in self._sessions.items()
+                ]
+            }
+
+    def close_all(self):
+        """Disconnect every pooled session."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._disconnect(session)
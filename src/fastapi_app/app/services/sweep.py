@@ -0,0 +1,314 @@
+"""Native asyncio host discovery, replacing the ``nmap -sn`` subprocess.
+
+Hosts are probed with ICMP echo where the process may open an ICMP
+socket: an unprivileged datagram socket (Linux, when the group is in
+``net.ipv4.ping_group_range``) or a raw socket (root/CAP_NET_RAW).
+Otherwise each host gets TCP connects to a few ports; an accepted *or
+refused* connection both prove the host is up.
+
+One ICMP socket serves the whole sweep, a fixed pool of workers keeps at
+most ``concurrency`` probes in flight, and a token bucket caps the packet
+rate, so a /24 finishes in about one timeout and a /16 streams through
+without creating 65k tasks up front.
+"""
+import asyncio
+import ipaddress
+import os
+import random
+import socket
+import struct
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+Target = Union[str, ipaddress.IPv4Network, Iterable[str]]
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def echo_request(identifier: int, sequence: int, payload: bytes = b"vandine-sweep") -> bytes:
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = _checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence) + payload
+
+
+def expand_targets(target: Target, max_hosts: int = 65536) -> Iterator[str]:
+    """Host addresses from a CIDR, a single address or a list, lazily.
+
+    Validation happens here rather than on first iteration, so a bad
+    target fails before any probe is sent.
+    """
+    if not isinstance(target, (str, ipaddress.IPv4Network)):
+        return iter(list(target))
+    network = ipaddress.ip_network(target, strict=False)
+    if network.version != 4:
+        raise ValueError("Only IPv4 sweeps are supported")
+    if network.num_addresses > max_hosts + 2:
+        raise ValueError(f"{network} has more than {max_hosts} hosts")
+    if network.num_addresses == 1:
+        return iter([str(network.network_address)])
+    return (str(address) for address in network.hosts())
+
+
+def count_targets(target: Target) -> Optional[int]:
+    if isinstance(target, (str, ipaddress.IPv4Network)):
+        network = ipaddress.ip_network(target, strict=False)
+        # /31 and /32 have no network or broadcast address to leave out
+        if network.num_addresses <= 2:
+            return network.num_addresses
+        return network.num_addresses - 2
+    return len(target) if hasattr(target, "__len__") else None
+
+
+class TokenBucket:
+    """Packets-per-second limiter shared by every probe in a sweep."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 20)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ICMPProber:
+    """Shares one ICMP socket between every echo in flight."""
+
+    def __init__(self, sock: socket.socket, raw: bool):
+        self.sock = sock
+        self.raw = raw
+        # Datagram sockets get their identifier rewritten by the kernel,
+        # which also filters replies for us; raw sockets see all ICMP
+        self.identifier = (os.getpid() ^ random.getrandbits(16)) & 0xFFFF
+        self.sequence = 0
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    def open(cls) -> Optional["ICMPProber"]:
+        """An ICMP prober, or None when this process may not send ICMP."""
+        for kind, raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+            try:
+                sock = socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP)
+            except (PermissionError, OSError):
+                continue
+            sock.setblocking(False)
+            return cls(sock, raw)
+        return None
+
+    async def _read_replies(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                data, (address, *_) = await loop.sock_recvfrom(self.sock, 2048)
+            except OSError:
+                # e.g. an ICMP error queued on a datagram socket
+                continue
+            if self.raw:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+            kind, _, _, identifier, _ = struct.unpack("!BBHHH", data[:8])
+            if kind != ICMP_ECHO_REPLY or (self.raw and identifier != self.identifier):
+                continue
+            waiter = self._waiting.get(address)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(time.perf_counter())
+
+    async def probe(self, host: str, timeout: float) -> Optional[float]:
+        """Round-trip time in seconds, or None on timeout."""
+        loop = asyncio.get_running_loop()
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read_replies())
+        try:
+            address = str(ipaddress.IPv4Address(host))
+        except ValueError:
+            # Device hosts may be names; replies are matched by address
+            try:
+                infos = await loop.getaddrinfo(host, None, family=socket.AF_INET)
+            except OSError:
+                return None
+            address = infos[0][4][0]
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        waiter = loop.create_future()
+        self._waiting[address] = waiter
+        try:
+            sent = time.perf_counter()
+            await loop.sock_sendto(self.sock, echo_request(self.identifier, self.sequence), (address, 0))
+            received = await asyncio.wait_for(waiter, timeout)
+            return received - sent
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._waiting.pop(address, None)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, OSError):
+                pass
+        self.sock.close()
+
+
+async def tcp_probe(
+    host: str,
+    ports: List[int],
+    timeout: float,
+    bucket: Optional[TokenBucket] = None
+) -> Optional[Tuple[float, int]]:
+    """(rtt, port) of the first port that accepts or refuses, else None."""
+
+    async def attempt(port: int) -> Tuple[float, int]:
+        if bucket is not None:
+            await bucket.acquire()
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except ConnectionRefusedError:
+            # A RST still means something answered at that address
+            return time.perf_counter() - started, port
+        rtt = time.perf_counter() - started
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            # The host already answered; a reset while closing changes nothing
+            pass
+        return rtt, port
+
+    tasks = [asyncio.create_task(attempt(port)) for port in ports]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            try:
+                return await finished
+            except (asyncio.TimeoutError, OSError):
+                continue
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SweepEngine:
+    """Concurrent, rate-limited host discovery."""
+
+    def __init__(
+        self,
+        concurrency: int = 512,
+        rate: float = 2000,
+        timeout: float = 1.0,
+        tcp_ports: Optional[List[int]] = None,
+        method: str = "auto",
+        max_hosts: int = 65536
+    ):
+        if method not in ("auto", "icmp", "tcp"):
+            raise ValueError(f"Unknown sweep method: {method}")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.tcp_ports = tcp_ports or [22, 80, 443]
+        self.method = method
+        self.max_hosts = max_hosts
+
+    def _open_icmp(self) -> Optional[ICMPProber]:
+        if self.method == "tcp":
+            return None
+        prober = ICMPProber.open()
+        if prober is None and self.method == "icmp":
+            raise PermissionError("ICMP sockets are not permitted for this process")
+        return prober
+
+    async def _probe(
+        self,
+        host: str,
+        icmp: Optional[ICMPProber],
+        bucket: TokenBucket
+    ) -> Dict[str, Any]:
+        if icmp is not None:
+            await bucket.acquire()
+            rtt = await icmp.probe(host, self.timeout)
+            if rtt is not None:
+                return {"ip": host, "status": "up", "method": "icmp", "rtt_ms": round(rtt * 1000, 2)}
+            return {"ip": host, "status": "down", "method": "icmp"}
+        found = await tcp_probe(host, self.tcp_ports, self.timeout, bucket)
+        if found is not None:
+            rtt, port = found
+            return {"ip": host, "status": "up", "method": "tcp", "port": port,
+                    "rtt_ms": round(rtt * 1000, 2)}
+        return {"ip": host, "status": "down", "method": "tcp"}
+
+    async def sweep(self, target: Target, include_down: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a result per host as soon as it is known.
+
+        Results arrive in completion order. Down hosts are only yielded
+        with ``include_down``, which callers reporting progress want.
+        """
+        hosts = expand_targets(target, self.max_hosts)
+        icmp = self._open_icmp()
+        bucket = TokenBucket(self.rate)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        done = object()
+
+        async def worker():
+            for host in hosts:
+                try:
+                    result = await self._probe(host, icmp, bucket)
+                except Exception as e:
+                    result = {"ip": host, "status": "down", "error": str(e)}
+                await results.put(result)
+            await results.put(done)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        remaining = len(workers)
+        try:
+            while remaining:
+                result = await results.get()
+                if result is done:
+                    remaining -= 1
+                elif include_down or result["status"] == "up":
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if icmp is not None:
+                await icmp.close()
+
+    async def scan(self, target: Target) -> List[Dict[str, Any]]:
+        """Every up host, sorted by address."""
+        found = [result async for result in self.sweep(target)]
+        return sorted(found, key=lambda result: ipaddress.ip_address(result["ip"]))
+
+    async def is_up(self, host: str) -> bool:
+        icmp = self._open_icmp()
+        try:
+            result = await self._probe(host, icmp, TokenBucket(self.rate))
+        finally:
+            if icmp is not None:
+                await icmp.close()
+        return result["status"] == "up"
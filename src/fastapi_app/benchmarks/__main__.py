@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Optional
+
+SUITE_NAMES = ["ingest", "query", "collector", "fanout"]
+# Suites that need a real Postgres; the rest never open a connection
+DATABASE_SUITES = {"ingest", "query"}
+
+
+def _ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Scale benchmarks for the FastAPI service"
+    )
+    parser.add_argument("--suite", action="append", choices=SUITE_NAMES,
+                        help="Suite to run; repeatable (default: all)")
+    parser.add_argument("--database-url", help="Throwaway Postgres for ingest/query (sets POSTGRES_*)")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--save-baseline", help="Also write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown before flagging (default: 0.2)")
+
+    ingest = parser.add_argument_group("ingest")
+    ingest.add_argument("--batches", type=int, default=200)
+    ingest.add_argument("--batch-size", type=int, default=1000)
+    ingest.add_argument("--concurrency", type=int, default=4)
+    ingest.add_argument("--writer-rows", type=int, default=50000)
+
+    query = parser.add_argument_group("query")
+    query.add_argument("--rows", type=int, default=1_000_000)
+    query.add_argument("--days", type=int, default=7)
+    query.add_argument("--iterations", type=int, default=50)
+
+    collector = parser.add_argument_group("collector")
+    collector.add_argument("--fleet-sizes", type=_ints, default=[10, 100, 1000])
+    collector.add_argument("--latency", type=float, default=0.2, help="Seconds per stubbed SSH poll")
+    collector.add_argument("--jitter", type=float, default=0.05)
+    collector.add_argument("--cycles", type=int, default=5)
+
+    fanout = parser.add_argument_group("fanout")
+    fanout.add_argument("--client-counts", type=_ints, default=[10, 100, 1000, 5000])
+    fanout.add_argument("--broadcasts", type=int, default=20)
+    fanout.add_argument("--snapshot-devices", type=int, default=50)
+    return parser.parse_args(argv)
+
+
+def _configure_database(options: argparse.Namespace, suites: List[str]):
+    """Point settings at the benchmark database before anything imports them.
+
+    Settings builds DATABASE_URL from the POSTGRES_* variables, so a
+    --database-url is split back into those. Suites that never touch the
+    database get placeholders, since Settings requires them to be set.
+    """
+    if options.database_url:
+        from sqlalchemy.engine import make_url
+        url = make_url(options.database_url)
+        os.environ.update({
+            "POSTGRES_DB": url.database or "",
+            "POSTGRES_USER": url.username or "",
+            "POSTGRES_PASSWORD": url.password or "",
+            "POSTGRES_HOST": url.host or "localhost",
+            "POSTGRES_PORT": str(url.port or 5432),
+        })
+    elif DATABASE_SUITES.intersection(suites) and "POSTGRES_DB" not in os.environ:
+        sys.exit("The ingest and query suites need --database-url or POSTGRES_* set")
+    else:
+        for name in ("POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"):
+            os.environ.setdefault(name, "bench")
+
+
+async def run(options: argparse.Namespace) -> int:
+    # Imported after POSTGRES_* are set, since settings read them on import
+    from .harness import Results, compare, load_results, write_results
+    from .suites import SUITES
+
+    suites = options.suite or SUITE_NAMES
+    results = Results()
+    for name in suites:
+        print(f"[{name}]")
+        started = time.perf_counter()
+        await SUITES[name](results, options)
+        print(f"  ({time.perf_counter() - started:.1f}s)")
+
+    database = None
+    if DATABASE_SUITES.intersection(suites):
+        from app.core.config import settings
+        from app.core.database import engine
+        await engine.dispose()
+        database = settings.DATABASE_URL.rsplit("@", 1)[-1]
+    document = results.document({"database": database})
+    write_results(options.output, document)
+    print(f"Results written to {options.output}")
+    if options.save_baseline:
+        write_results(options.save_baseline, document)
+        print(f"Baseline written to {options.save_baseline}")
+
+    if options.baseline and os.path.exists(options.baseline):
+        regressions = compare(results.values, load_results(options.baseline), options.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {options.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {options.tolerance:.0%} against {options.baseline}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    options = parse_args(argv)
+    _configure_database(options, options.suite or SUITE_NAMES)
+    sys.exit(asyncio.run(run(options)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Load-test the real MetricsCollector against a simulated fleet.
+
+Starts a ``SimulatedFleet`` in-process (or targets one already served by
+``python -m benchmarks.simulator`` with ``--external``, which keeps the
+servers out of the memory numbers), polls it with ``collect_all_metrics``
+for a number of cycles and reports cycle time, per-device latency
+percentiles, error counts and memory::
+
+    python -m benchmarks.fleet --devices 500 --backend asyncssh --cycles 5
+    python -m benchmarks.fleet --devices 2000 --backend netmiko --external --output fleet.json
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from .simulator import SimulatedFleet, add_fleet_arguments
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fleet", description=__doc__.splitlines()[0])
+    add_fleet_arguments(parser)
+    parser.add_argument("--backend", choices=["netmiko", "asyncssh"], default="asyncssh")
+    parser.add_argument("--probe-mode", choices=["composite", "sequential"], default="composite")
+    parser.add_argument("--max-concurrency", type=int, default=100,
+                        help="SSH_MAX_CONCURRENCY for the asyncssh backend")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--external", action="store_true",
+                        help="Use a fleet already served by benchmarks.simulator")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run(options: argparse.Namespace) -> int:
+    # Settings are read on import, so the backend must be chosen first
+    os.environ["SSH_BACKEND"] = options.backend
+    os.environ["METRICS_PROBE_MODE"] = options.probe_mode
+    os.environ["SSH_MAX_CONCURRENCY"] = str(options.max_concurrency)
+    # Settings requires these even though nothing here opens the database
+    for name in ("POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"):
+        os.environ.setdefault(name, "bench")
+    from app.services.metrics_collector import MetricsCollector
+    from .harness import Results, compare, load_results, write_results
+    from .stubs import StaticInventory
+
+    device_latencies: List[float] = []
+
+    class TimedCollector(MetricsCollector):
+        async def collect_device_metrics(self, device: Dict[str, Any]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                return await super().collect_device_metrics(device)
+            finally:
+                device_latencies.append(time.perf_counter() - started)
+
+    fleet = SimulatedFleet(
+        options.devices,
+        base_port=options.base_port,
+        latency=options.latency,
+        jitter=options.jitter,
+        failure_rate=options.failure_rate,
+        host=options.host,
+        seed=options.seed
+    )
+    if not options.external:
+        print(f"Starting {options.devices} simulated devices...")
+        await fleet.start()
+
+    collector = TimedCollector(StaticInventory(fleet.devices()))
+    results = Results()
+    name = f"fleet.{options.backend}.{options.probe_mode}.{options.devices}_devices"
+    tracemalloc.start()
+    cycle_times = []
+    errors = 0
+    try:
+        for cycle in range(options.cycles):
+            started = time.perf_counter()
+            metrics = await collector.collect_all_metrics()
+            elapsed = time.perf_counter() - started
+            failed = sum(1 for value in metrics.values() if value.get('status') != 'online')
+            print(f"  cycle {cycle + 1}: {elapsed:.2f}s, {failed} failed")
+            # The first cycle pays for connection setup; report it separately
+            if cycle == 0:
+                results.record(f"{name}.first_cycle_ms", elapsed * 1000, "ms")
+                device_latencies.clear()
+            else:
+                cycle_times.append(elapsed)
+                errors += failed
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await collector.close()
+        if not options.external:
+            await fleet.stop()
+
+    if cycle_times:
+        results.latencies(f"{name}.cycle", cycle_times)
+        results.record(
+            f"{name}.devices_per_sec",
+            options.devices * len(cycle_times) / sum(cycle_times),
+            "devices/s",
+            better="higher"
+        )
+        results.latencies(f"{name}.device", device_latencies)
+        results.record(f"{name}.error_rate", errors / (options.devices * len(cycle_times)), "ratio")
+    results.record(f"{name}.peak_traced_mb", peak_traced / (1024 * 1024), "MB")
+    results.record(f"{name}.peak_rss_mb", _rss_mb(), "MB")
+
+    document = results.document({
+        "backend": options.backend,
+        "probe_mode": options.probe_mode,
+        "devices": options.devices,
+        "latency": options.latency,
+        "jitter": options.jitter,
+        "failure_rate": options.failure_rate,
+        "simulator": "external" if options.external else "in-process"
+    })
+    if options.output:
+        write_results(options.output, document)
+        print(f"Results written to {options.output}")
+    if options.baseline and os.path.exists(options.baseline):
+        regressions = compare(results.values, load_results(options.baseline), options.tolerance)
+        for line in regressions:
+            print(f"  regression: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    options = parse_args(argv)
+    if not 1 <= options.devices <= 5000:
+        sys.exit("--devices must be between 1 and 5000")
+    sys.exit(asyncio.run(run(options)))
+
+
+if __name__ == "__main__":
+    main()
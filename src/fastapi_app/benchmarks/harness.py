@@ -0,0 +1,89 @@
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Results:
+    """Named measurements plus which direction counts as better."""
+
+    def __init__(self):
+        self.values: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, value: float, unit: str, better: str = "lower"):
+        self.values[name] = {"value": round(value, 3), "unit": unit, "better": better}
+        print(f"  {name:<48} {value:>12.3f} {unit}")
+
+    def latencies(self, name: str, samples: List[float]):
+        """Record p50/p95/p99/max in milliseconds from samples in seconds."""
+        for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            self.record(f"{name}.{label}_ms", percentile(samples, fraction) * 1000, "ms")
+        self.record(f"{name}.max_ms", max(samples) * 1000 if samples else 0.0, "ms")
+
+    def document(self, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                **(meta or {})
+            },
+            "results": self.values
+        }
+
+
+async def sample(
+    call: Callable[[], Awaitable[Any]],
+    iterations: int,
+    warmup: int = 3
+) -> List[float]:
+    """Await ``call`` repeatedly and return each run's wall time in seconds."""
+    for _ in range(warmup):
+        await call()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def write_results(path: str, document: Dict[str, Any]):
+    with open(path, "w") as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as handle:
+        return json.load(handle)["results"]
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float
+) -> List[str]:
+    """Describe every result that is worse than baseline beyond ``tolerance``."""
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        result = current.get(name)
+        if result is None or not base["value"]:
+            continue
+        change = (result["value"] - base["value"]) / base["value"]
+        worse = change > tolerance if base["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append(
+                f"{name}: {base['value']} -> {result['value']} {result['unit']} ({change:+.1%})"
+            )
+    return regressions
@@ -0,0 +1,287 @@
+"""Simulated fleet of SSH-speaking Linux hosts for collector load tests.
+
+Each simulated device is an asyncssh server on its own localhost port.
+It answers the probe commands (``top``, ``free``, ``df``, ``vcgencmd``,
+``uptime -s``, ``echo``) with realistic, slowly drifting output, both as
+exec requests (asyncssh backend) and in an interactive shell with a
+``user@host:~$`` prompt (netmiko backend). Every command waits
+``latency`` +/- ``jitter`` seconds, and with probability ``failure_rate``
+the connection is dropped instead of answered.
+
+Serve a fleet for a collector in another process::
+
+    python -m benchmarks.simulator --devices 1000 --base-port 20022 --latency 0.05
+
+Large fleets need one file descriptor per listener and connection, so
+raise ``ulimit -n`` first.
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncssh
+
+USERNAME = "pi"
+PASSWORD = "raspberry"
+
+
+class SimulatedDevice:
+    """Drifting system state for one fake Raspberry Pi."""
+
+    def __init__(self, name: str, rng: random.Random):
+        self.name = name
+        self.rng = rng
+        self.cpu = rng.uniform(2, 40)
+        self.memory_total = rng.choice([926, 1849, 3794, 7812])
+        self.memory_used = self.memory_total * rng.uniform(0.2, 0.7)
+        self.disk_size = rng.choice([14, 29, 58, 117])
+        self.disk_used = self.disk_size * rng.uniform(0.1, 0.8)
+        self.temperature = rng.uniform(42, 60)
+        self.booted = datetime.now() - timedelta(seconds=rng.uniform(3600, 90 * 86400))
+
+    @staticmethod
+    def _drift(value: float, step: float, low: float, high: float, rng: random.Random) -> float:
+        return min(high, max(low, value + rng.uniform(-step, step)))
+
+    def tick(self):
+        self.cpu = self._drift(self.cpu, 5, 0.3, 99.5, self.rng)
+        self.memory_used = self._drift(self.memory_used, 20, 80, self.memory_total * 0.97, self.rng)
+        self.disk_used = self._drift(self.disk_used, 0.01, 0.5, self.disk_size * 0.99, self.rng)
+        self.temperature = self._drift(self.temperature, 0.8, 35, 84, self.rng)
+
+    def top(self) -> str:
+        user = self.cpu * 0.7
+        system = self.cpu * 0.25
+        softirq = self.cpu - user - system
+        return (
+            f"%Cpu(s): {user:4.1f} us, {system:4.1f} sy,  0.0 ni, {100 - self.cpu:4.1f} id,"
+            f"  0.0 wa,  0.0 hi, {softirq:4.1f} si,  0.0 st"
+        )
+
+    def free(self) -> str:
+        total = self.memory_total
+        used = int(self.memory_used)
+        shared = int(total * 0.01)
+        cache = int((total - used) * 0.45)
+        free = total - used - cache
+        available = total - used
+        return f"Mem:          {total:5d}       {used:5d}       {free:5d}       {shared:5d}       {cache:5d}       {available:5d}"
+
+    def df(self) -> str:
+        used = self.disk_used
+        available = self.disk_size - used
+        percent = round(used / self.disk_size * 100)
+        return f"/dev/root        {self.disk_size}G  {used:.1f}G   {available:.0f}G  {percent}% /"
+
+    def measure_temp(self) -> str:
+        return f"temp={self.temperature:.1f}'C"
+
+    def uptime_since(self) -> str:
+        return self.booted.strftime("%Y-%m-%d %H:%M:%S")
+
+    def run_one(self, command: str) -> Tuple[str, int]:
+        command = command.strip()
+        if not command:
+            return "", 0
+        if command.startswith("echo "):
+            return command[5:].strip().strip("'\"") + "\n", 0
+        name = command.split()[0]
+        handlers = {
+            "top": self.top,
+            "free": self.free,
+            "df": self.df,
+            "vcgencmd": self.measure_temp,
+            "uptime": self.uptime_since,
+            "hostname": lambda: self.name,
+        }
+        if name not in handlers:
+            return f"bash: {name}: command not found\n", 127
+        return handlers[name]() + "\n", 0
+
+    def execute(self, command_line: str) -> Tuple[str, int]:
+        """Run a ``;``-separated command line, as the composite probe sends."""
+        self.tick()
+        output = []
+        status = 0
+        for command in re.split(r";\s*", command_line):
+            text, status = self.run_one(command)
+            output.append(text)
+        return "".join(output), status
+
+
+class _Server(asyncssh.SSHServer):
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return True
+
+
+class SimulatedFleet:
+    """``count`` simulated devices listening on consecutive localhost ports."""
+
+    def __init__(
+        self,
+        count: int,
+        base_port: int = 20022,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        failure_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        seed: Optional[int] = None
+    ):
+        self.count = count
+        self.base_port = base_port
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.host = host
+        self.rng = random.Random(seed)
+        self.devices_by_port: Dict[int, SimulatedDevice] = {}
+        self._servers: List[Any] = []
+        self.stats = {"commands": 0, "failures": 0, "sessions": 0}
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """Inventory entries pointing the collector at the fleet."""
+        return [
+            {
+                "id": index + 1,
+                "name": f"sim-{index:04d}",
+                "host": self.host,
+                "port": self.base_port + index,
+                "username": USERNAME,
+                "password": PASSWORD,
+                "device_type": "linux"
+            }
+            for index in range(self.count)
+        ]
+
+    async def _respond(self, process, device: SimulatedDevice, command: str) -> Optional[Tuple[str, int]]:
+        """Wait out the simulated link, then answer or drop the connection."""
+        self.stats["commands"] += 1
+        await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            self.stats["failures"] += 1
+            process.get_extra_info("connection").abort()
+            return None
+        return device.execute(command)
+
+    def _handler(self, device: SimulatedDevice):
+        prompt = f"{USERNAME}@{device.name}:~$ "
+
+        async def handle(process):
+            self.stats["sessions"] += 1
+            if process.command is not None:
+                result = await self._respond(process, device, process.command)
+                if result is not None:
+                    output, status = result
+                    process.stdout.write(output)
+                    process.exit(status)
+                return
+
+            # Interactive shell, as netmiko opens one
+            process.stdout.write(prompt)
+            while True:
+                try:
+                    line = await process.stdin.readline()
+                except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged):
+                    continue
+                except (asyncssh.Error, ConnectionError):
+                    return
+                if not line:
+                    break
+                # A terminal echoes input; netmiko's send_command waits for
+                # the echoed command before it reads the output
+                process.stdout.write(line.rstrip("\r\n") + "\r\n")
+                command = line.strip()
+                if command in ("exit", "logout"):
+                    break
+                if command:
+                    result = await self._respond(process, device, command)
+                    if result is None:
+                        return
+                    process.stdout.write(result[0])
+                process.stdout.write(prompt)
+            process.exit(0)
+
+        return handle
+
+    async def start(self):
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        for index in range(self.count):
+            port = self.base_port + index
+            device = SimulatedDevice(f"sim-{index:04d}", random.Random(self.rng.random()))
+            self.devices_by_port[port] = device
+            self._servers.append(await asyncssh.create_server(
+                _Server,
+                self.host,
+                port,
+                server_host_keys=[host_key],
+                process_factory=self._handler(device),
+                encoding="utf-8"
+            ))
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+        await asyncio.gather(*(server.wait_closed() for server in self._servers))
+        self._servers = []
+
+
+async def _serve(options: argparse.Namespace):
+    fleet = SimulatedFleet(
+        options.devices,
+        base_port=options.base_port,
+        latency=options.latency,
+        jitter=options.jitter,
+        failure_rate=options.failure_rate,
+        host=options.host,
+        seed=options.seed
+    )
+    started = time.perf_counter()
+    await fleet.start()
+    last = options.base_port + options.devices - 1
+    print(
+        f"{options.devices} simulated devices on {options.host}:{options.base_port}-{last}"
+        f" (started in {time.perf_counter() - started:.1f}s); login {USERNAME}/{PASSWORD}"
+    )
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"commands={fleet.stats['commands']} failures={fleet.stats['failures']}"
+                  f" sessions={fleet.stats['sessions']}")
+    finally:
+        await fleet.stop()
+
+
+def add_fleet_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--devices", type=int, default=100, help="Simulated devices (1-5000)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=20022)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per command")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability a command drops the connection")
+    parser.add_argument("--seed", type=int)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.simulator", description=__doc__.splitlines()[0])
+    add_fleet_arguments(parser)
+    options = parser.parse_args(argv)
+    if not 1 <= options.devices <= 5000:
+        parser.error("--devices must be between 1 and 5000")
+    try:
+        asyncio.run(_serve(options))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
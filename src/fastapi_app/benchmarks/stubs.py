@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+from app.services.metrics_collector import MetricsCollector
+
+
+def bench_devices(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': index + 1,
+            'name': f'bench-{index:04d}',
+            'host': '127.0.0.1',
+            'port': 22,
+            'username': 'bench',
+            'password': 'bench',
+            'device_type': 'linux'
+        }
+        for index in range(count)
+    ]
+
+
+class StaticInventory:
+    """A fixed list of devices standing in for DeviceInventory."""
+
+    def __init__(self, devices: List[Dict[str, Any]]):
+        self._devices = devices
+
+    async def refresh_if_stale(self):
+        pass
+
+    def devices(self) -> List[Dict[str, Any]]:
+        return list(self._devices)
+
+    def collection_targets(self) -> List[Dict[str, Any]]:
+        return list(self._devices)
+
+
+def fake_metrics(device: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'status': 'online',
+        'host': device['host'],
+        'cpu_percent': round(random.uniform(1, 95), 1),
+        'memory_percent': round(random.uniform(20, 90), 1),
+        'disk_percent': round(random.uniform(10, 80), 1),
+        'temperature_c': round(random.uniform(40, 75), 1),
+        'uptime': '3 days, 4:05'
+    }
+
+
+class StubCollector(MetricsCollector):
+    """MetricsCollector whose SSH round trip is replaced by a sleep.
+
+    ``backend="executor"`` sleeps inside the thread pool like the netmiko
+    path does; ``backend="async"`` sleeps on the event loop under a
+    semaphore like the asyncssh path.
+    """
+
+    def __init__(
+        self,
+        inventory: StaticInventory,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        backend: str = "executor",
+        max_concurrency: int = 100
+    ):
+        super().__init__(inventory)
+        self.latency = latency
+        self.jitter = jitter
+        self.backend = backend
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.max_concurrency = max_concurrency
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _collect_metrics_sync(self, device: Dict[str, Any]) -> Dict[str, Any]:
+        time.sleep(self._delay())
+        return fake_metrics(device)
+
+    async def _collect_metrics_async(self, device: Dict[str, Any]) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            await asyncio.sleep(self._delay())
+        return fake_metrics(device)
+
+    async def collect_device_metrics(self, device: Dict[str, Any]) -> Dict[str, Any]:
+        if self.backend == "async":
+            return await self._collect_metrics_async(device)
+        return await super().collect_device_metrics(device)
+
+
+class FakeWebSocket:
+    """Just enough of starlette's WebSocket for ConnectionManager."""
+
+    def __init__(self, subprotocols: List[str], expected: int, done: asyncio.Event, counter: List[int]):
+        self.scope = {"subprotocols": subprotocols}
+        self.expected = expected
+        self.received = 0
+        self.bytes_received = 0
+        self._done = done
+        self._counter = counter
+
+    async def accept(self, subprotocol: Optional[str] = None):
+        self.subprotocol = subprotocol
+
+    async def _receive(self, size: int):
+        self.received += 1
+        self.bytes_received += size
+        if self.received == self.expected:
+            self._counter[0] -= 1
+            if self._counter[0] == 0:
+                self._done.set()
+
+    async def send_text(self, message: str):
+        await self._receive(len(message))
+
+    async def send_bytes(self, message: bytes):
+        await self._receive(len(message))
@@ -0,0 +1,228 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+from .harness import Results, sample
+from .stubs import FakeWebSocket, StaticInventory, StubCollector, bench_devices, fake_metrics
+
+BENCH_DEVICES = 50
+METRIC_TYPES = ("cpu", "memory", "disk", "temperature")
+
+
+def _client():
+    import httpx
+    from app.main import app
+    # ASGITransport skips the lifespan, so no collector or writer runs
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def _prepare_database(days: int) -> List[int]:
+    """Apply the schema, make partitions for the seeded window, add devices."""
+    from sqlalchemy import text
+    from app.core.config import settings
+    from app.core.database import engine
+    from app.core.partitions import create_partitions, is_partitioned
+    from app.core.schema import ensure_schema
+
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_schema)
+        if settings.METRICS_PARTITIONING and await is_partitioned(conn):
+            today = datetime.now(timezone.utc).date()
+            await create_partitions(conn, today - timedelta(days=days), days + 2)
+        await conn.execute(text(
+            "INSERT INTO devices (name, ip_address, device_type, username, password, is_active)"
+            " SELECT 'bench-' || lpad(i::text, 4, '0'), '127.0.0.1', 'linux', 'bench', 'bench', true"
+            " FROM generate_series(0, :count - 1) AS i"
+            " ON CONFLICT (name) DO NOTHING"
+        ), {"count": BENCH_DEVICES})
+        result = await conn.execute(text(
+            "SELECT id FROM devices WHERE name LIKE 'bench-%' ORDER BY id"
+        ))
+        return list(result.scalars())
+
+
+async def _seed_metrics(device_ids: List[int], rows: int, days: int):
+    """Top network_metrics up to ``rows`` rows spread over ``days`` days."""
+    from sqlalchemy import text
+    from app.core.database import engine
+
+    async with engine.begin() as conn:
+        existing = (await conn.execute(text("SELECT count(*) FROM network_metrics"))).scalar()
+        missing = rows - existing
+        if missing <= 0:
+            print(f"  network_metrics already holds {existing} rows")
+            return
+        print(f"  seeding {missing} rows...")
+        started = time.perf_counter()
+        # Generated server side; 1M rows this way takes seconds, not minutes
+        await conn.execute(text(
+            "INSERT INTO network_metrics (device_id, timestamp, metric_type, value, unit, metadata)"
+            " SELECT ids[1 + (i % cardinality(ids))],"
+            " now() - (random() * :seconds) * interval '1 second',"
+            " (ARRAY['cpu', 'memory', 'disk', 'temperature'])[1 + (i % 4)],"
+            " random() * 100, 'percent', '{\"source\": \"bench\"}'::json"
+            " FROM generate_series(1, :missing) AS i,"
+            " (SELECT CAST(:ids AS integer[]) AS ids) AS fleet"
+        ), {"ids": device_ids, "seconds": days * 86400, "missing": missing})
+        await conn.execute(text("ANALYZE network_metrics"))
+        print(f"  seeded in {time.perf_counter() - started:.1f}s")
+
+
+def _batch(device_ids: List[int], size: int) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "device_id": random.choice(device_ids),
+            "metric_type": random.choice(METRIC_TYPES),
+            "value": random.uniform(0, 100),
+            "unit": "percent",
+            "timestamp": (now - timedelta(seconds=random.uniform(0, 60))).isoformat(),
+            "metadata": {"source": "bench"}
+        }
+        for _ in range(size)
+    ]
+
+
+async def run_ingest(results: Results, options):
+    from app.services.metric_writer import MetricWriter
+
+    device_ids = await _prepare_database(options.days)
+
+    async with _client() as client:
+        batches = [_batch(device_ids, options.batch_size) for _ in range(options.batches)]
+        semaphore = asyncio.Semaphore(options.concurrency)
+        latencies: List[float] = []
+
+        async def post(batch):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/metrics/batch", json=batch)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(batch) for batch in batches))
+        elapsed = time.perf_counter() - started
+    total = options.batches * options.batch_size
+    results.record("ingest.batch_endpoint.rows_per_sec", total / elapsed, "rows/s", better="higher")
+    results.latencies("ingest.batch_endpoint.request", latencies)
+
+    rows = [
+        {**row, "timestamp": datetime.fromisoformat(row["timestamp"])}
+        for row in _batch(device_ids, options.writer_rows)
+    ]
+    writer = MetricWriter(max_queue=10000, batch_size=500, flush_interval=0.2)
+    await writer.start()
+    started = time.perf_counter()
+    await writer.submit(rows)
+    while writer.stats()["written"] + writer.stats()["failed"] < len(rows):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await writer.stop()
+    results.record("ingest.metric_writer.rows_per_sec", len(rows) / elapsed, "rows/s", better="higher")
+
+
+async def run_query(results: Results, options):
+    device_ids = await _prepare_database(options.days)
+    await _seed_metrics(device_ids, options.rows, options.days)
+    hours = options.days * 24 + 24
+    device_id = device_ids[0]
+
+    async with _client() as client:
+        async def get(path: str):
+            response = await client.get(path)
+            response.raise_for_status()
+            return response
+
+        # A cursor from ten pages in, to check deep pages cost the same
+        cursor = None
+        for _ in range(10):
+            suffix = f"&cursor={cursor}" if cursor else ""
+            cursor = (await get(f"/api/v1/metrics/?limit=1000&hours={hours}{suffix}")).headers.get("x-next-cursor")
+
+        queries = {
+            "history_first_page": f"/api/v1/metrics/?limit=1000&hours={hours}",
+            "history_deep_page": f"/api/v1/metrics/?limit=1000&hours={hours}&cursor={cursor}",
+            "history_device": f"/api/v1/metrics/?device_id={device_id}&metric_type=cpu&limit=1000&hours={hours}",
+            "latest_all": "/api/v1/metrics/latest",
+            "latest_types": "/api/v1/metrics/latest?metric_type=cpu&metric_type=memory",
+            "series_1h_p95": f"/api/v1/metrics/series?device_id={device_id}&metric_type=cpu&hours={hours}&bucket=1h&agg=p95",
+            "realtime": f"/api/v1/metrics/realtime/{device_id}",
+            "devices": "/api/v1/devices/",
+        }
+        for name, path in queries.items():
+            if name == "history_deep_page" and cursor is None:
+                continue
+            samples = await sample(lambda: get(path), options.iterations)
+            results.latencies(f"query.{name}", samples)
+
+
+async def run_collector(results: Results, options):
+    for backend in ("executor", "async"):
+        for fleet in options.fleet_sizes:
+            collector = StubCollector(
+                StaticInventory(bench_devices(fleet)),
+                latency=options.latency,
+                jitter=options.jitter,
+                backend=backend
+            )
+            samples = await sample(collector.collect_all_metrics, options.cycles, warmup=1)
+            await collector.close()
+            results.latencies(f"collector.{backend}.{fleet}_devices.cycle", samples)
+
+
+async def run_fanout(results: Results, options):
+    from app.api.endpoints.websocket import ConnectionManager
+    from app.services.metrics_stream import PROTOCOL_DELTA_JSON, PROTOCOL_FULL_JSON
+
+    fleet = bench_devices(options.snapshot_devices)
+    protocols = {"full": PROTOCOL_FULL_JSON, "delta": PROTOCOL_DELTA_JSON}
+    for label, protocol in protocols.items():
+        for clients in options.client_counts:
+            manager = ConnectionManager(queue_size=options.broadcasts + 1)
+            done = asyncio.Event()
+            remaining = [clients]
+            pumps = []
+            for _ in range(clients):
+                websocket = FakeWebSocket([protocol], options.broadcasts, done, remaining)
+                client = await manager.connect(websocket)
+                pumps.append(asyncio.create_task(client.pump()))
+
+            broadcast_times = []
+            started = time.perf_counter()
+            for _ in range(options.broadcasts):
+                snapshot = {
+                    "type": "metrics_update",
+                    "data": {device["name"]: fake_metrics(device) for device in fleet}
+                }
+                begun = time.perf_counter()
+                await manager.broadcast(snapshot)
+                broadcast_times.append(time.perf_counter() - begun)
+                # Let the pumps run between snapshots, as the poll interval would
+                await asyncio.sleep(0)
+            await done.wait()
+            delivered = time.perf_counter() - started
+            for task in pumps:
+                task.cancel()
+            # Bounded, so a pump that ignores cancellation fails the run
+            # instead of hanging it
+            _, stuck = await asyncio.wait(pumps, timeout=5)
+            if stuck:
+                raise RuntimeError(f"{len(stuck)} websocket pumps did not stop when cancelled")
+
+            name = f"fanout.{label}.{clients}_clients"
+            results.latencies(f"{name}.broadcast", broadcast_times)
+            results.record(
+                f"{name}.deliver_all_ms",
+                delivered / options.broadcasts * 1000,
+                "ms/snapshot"
+            )
+
+
+SUITES = {
+    "ingest": run_ingest,
+    "query": run_query,
+    "collector": run_collector,
+    "fanout": run_fanout,
+}
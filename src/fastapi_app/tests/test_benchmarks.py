@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+
+
+def test_database_free_suites_smoke(tmp_path):
+    output = tmp_path / "results.json"
+    with pytest.raises(SystemExit) as exit_info:
+        main([
+            "--suite", "collector", "--suite", "fanout",
+            "--fleet-sizes", "5", "--latency", "0.001", "--jitter", "0", "--cycles", "1",
+            "--client-counts", "3", "--broadcasts", "2", "--snapshot-devices", "2",
+            "--output", str(output),
+        ])
+    assert exit_info.value.code == 0
+    document = json.loads(output.read_text())
+    assert document["environment"]["database"] is None
+    names = set(document["results"])
+    assert "collector.async.5_devices.cycle.p50_ms" in names
+    assert "fanout.delta.3_clients.deliver_all_ms" in names
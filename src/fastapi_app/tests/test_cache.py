@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.core import cache
+from app.core.cache import ReadThroughCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("down")
+
+    async def incr(self, key):
+        raise ConnectionError("down")
+
+
+@pytest.fixture(params=["redis", "local"])
+def redis(request, monkeypatch):
+    redis = FakeRedis() if request.param == "redis" else None
+    monkeypatch.setattr(cache, "get_redis", lambda: redis)
+    return redis
+
+
+class SlowLoader:
+    def __init__(self, value="loaded"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load(redis):
+    store = ReadThroughCache("test", ttl=30)
+    loader = SlowLoader({"devices": [1, 2]})
+    waiters = [asyncio.create_task(store.get_or_load("all", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    assert store.stats()["inflight"] == 1
+    loader.release.set()
+    results = await asyncio.gather(*waiters)
+    assert results == [{"devices": [1, 2]}] * 10
+    assert loader.calls == 1
+    assert store.stats()["inflight"] == 0
+    # Now cached: no further loads
+    assert await store.get_or_load("all", loader) == {"devices": [1, 2]}
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_load(redis):
+    store = ReadThroughCache("test", ttl=30)
+    loader = SlowLoader()
+    first = asyncio.create_task(store.get_or_load("key", loader))
+    second = asyncio.create_task(store.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    loader.release.set()
+    assert await second == "loaded"
+    assert first.cancelled()
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_none_is_cached(redis):
+    store = ReadThroughCache("test", ttl=30)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return None
+
+    assert await store.get_or_load("key", loader) is None
+    assert await store.get_or_load("key", loader) is None
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_bumps_version(redis):
+    store = ReadThroughCache("test", ttl=30)
+    values = iter(["first", "second"])
+
+    async def loader():
+        return next(values)
+
+    before = await store._version()
+    assert await store.get_or_load("key", loader) == "first"
+    await store.invalidate()
+    after = await store._version()
+    assert after != before
+    if redis is not None:
+        assert (before, after) == ("r0", "r1")
+        assert redis.data["test:version"] == 1
+    else:
+        assert (before, after) == ("l0", "l1")
+    assert await store.get_or_load("key", loader) == "second"
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_when_redis_fails(monkeypatch):
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+    store = ReadThroughCache("test", ttl=30, redis_retry=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "value"
+
+    assert await store.get_or_load("key", loader) == "value"
+    assert await store.get_or_load("key", loader) == "value"
+    assert len(calls) == 1
+    assert store._redis() is None
+    assert store.stats()["local_entries"] == 1
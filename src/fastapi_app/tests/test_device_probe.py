@@ -0,0 +1,162 @@
+from app.services.device_probe import (
+    END_MARKER,
+    PROBE_COMMANDS,
+    build_probe_command,
+    parse_cpu,
+    parse_disk,
+    parse_memory,
+    parse_probe_output,
+    parse_section,
+    parse_temperature,
+    parse_uptime,
+    probe_complete,
+    section_marker,
+    split_sections,
+)
+
+# Recorded from a Raspberry Pi 4 (Raspberry Pi OS, procps-ng 3.3.17)
+TOP = "%Cpu(s):  2.3 us,  1.1 sy,  0.0 ni, 96.4 id,  0.0 wa,  0.0 hi,  0.2 si,  0.0 st"
+FREE = "Mem:            3793         412        2871          21         509        3296"
+DF = "/dev/root        29G  6.1G   22G  23% /"
+TEMP = "temp=48.3'C"
+UPTIME = "2024-05-01 10:12:33"
+
+SECTION_OUTPUT = {
+    'cpu': TOP,
+    'memory': FREE,
+    'disk': DF,
+    'temperature': TEMP,
+    'uptime': UPTIME,
+}
+
+
+def composite_output(sections=None, end=True, echo=True):
+    """Build what netmiko hands back for the composite probe."""
+    sections = SECTION_OUTPUT if sections is None else sections
+    lines = [build_probe_command()] if echo else []
+    for section, text in sections.items():
+        lines.append(section_marker(section))
+        lines.append(text)
+    if end:
+        lines.append(END_MARKER)
+    return "\n".join(lines)
+
+
+def test_parse_cpu():
+    assert parse_cpu(TOP) == {'cpu_percent': 3.6}
+
+
+def test_parse_cpu_without_idle_field():
+    assert parse_cpu("%Cpu(s):  2.3 us,  1.1 sy") == {}
+
+
+def test_parse_memory():
+    assert parse_memory(FREE) == {
+        'memory_percent': 10.86,
+        'memory_mb': {'total': 3793.0, 'used': 412.0}
+    }
+
+
+def test_parse_memory_truncated():
+    assert parse_memory("Mem:") == {}
+
+
+def test_parse_disk():
+    assert parse_disk(DF) == {
+        'disk_percent': 23.0,
+        'disk_gb': {'total': '29G', 'used': '6.1G', 'available': '22G'}
+    }
+
+
+def test_parse_disk_truncated():
+    assert parse_disk("/dev/root        29G  6.1G") == {}
+
+
+def test_parse_temperature():
+    assert parse_temperature(TEMP) == {'temperature_c': 48.3}
+
+
+def test_parse_temperature_fallback_without_vcgencmd():
+    # Non-Pi hosts run the "|| echo 'temp=0'" branch of the probe
+    assert parse_temperature("temp=0") == {'temperature_c': 0.0}
+
+
+def test_parse_temperature_missing():
+    assert parse_temperature("") == {}
+
+
+def test_parse_uptime():
+    assert parse_uptime(UPTIME + "\n") == {'uptime': UPTIME}
+    assert parse_uptime("  ") == {}
+
+
+def test_parse_section_tolerates_malformed_output():
+    assert parse_section('cpu', "%Cpu(s): garbage id, x") == {}
+    assert parse_section('memory', "Mem: total used") == {}
+    assert parse_section('memory', "Mem: 0 0") == {}
+    assert parse_section('temperature', "temp=hot") == {}
+    assert parse_section('disk', "") == {}
+
+
+def test_build_probe_command_covers_every_section():
+    command = build_probe_command()
+    for section, probe in PROBE_COMMANDS.items():
+        assert f"echo {section_marker(section)}; {probe}" in command
+    assert command.endswith(f"echo {END_MARKER}")
+
+
+def test_split_sections_ignores_echoed_command_line():
+    assert split_sections(composite_output()) == SECTION_OUTPUT
+
+
+def test_parse_probe_output():
+    assert parse_probe_output(composite_output()) == {
+        'cpu_percent': 3.6,
+        'memory_percent': 10.86,
+        'memory_mb': {'total': 3793.0, 'used': 412.0},
+        'disk_percent': 23.0,
+        'disk_gb': {'total': '29G', 'used': '6.1G', 'available': '22G'},
+        'temperature_c': 48.3,
+        'uptime': UPTIME,
+    }
+
+
+def test_parse_probe_output_missing_section():
+    sections = {k: v for k, v in SECTION_OUTPUT.items() if k != 'temperature'}
+    metrics = parse_probe_output(composite_output(sections))
+    assert 'temperature_c' not in metrics
+    assert metrics['cpu_percent'] == 3.6
+    assert metrics['uptime'] == UPTIME
+
+
+def test_probe_complete():
+    assert probe_complete(composite_output())
+    # The echoed command contains the end marker but not on a line of its own
+    assert not probe_complete(composite_output(end=False))
+    assert not probe_complete("")
+
+
+def test_parse_probe_output_truncated_before_end_marker():
+    # Output cut off mid-probe: sections seen so far still parse
+    sections = {'cpu': TOP, 'memory': FREE}
+    metrics = parse_probe_output(composite_output(sections, end=False))
+    assert metrics['cpu_percent'] == 3.6
+    assert metrics['memory_percent'] == 10.86
+    assert 'disk_percent' not in metrics
+
+
+def test_parse_probe_output_truncated_mid_line():
+    output = composite_output({'cpu': TOP, 'memory': "Mem:            3793"}, end=False)
+    metrics = parse_probe_output(output)
+    assert metrics == {'cpu_percent': 3.6}
+
+
+def test_parse_probe_output_empty_section():
+    metrics = parse_probe_output(composite_output({'cpu': "", 'disk': DF}))
+    assert 'cpu_percent' not in metrics
+    assert metrics['disk_percent'] == 23.0
+
+
+def test_parse_probe_output_without_markers():
+    assert parse_probe_output("bash: top: command not found") == {}
+    assert parse_probe_output("") == {}
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.device_status import DeviceStatusMonitor
+
+
+class StubInventory:
+    def __init__(self, hosts):
+        self.hosts = list(hosts)
+
+    def devices(self):
+        return [{"name": f"dev-{host}", "host": host} for host in self.hosts]
+
+
+class StubEngine:
+    """Reports every host in ``up`` as reachable; can block mid-sweep."""
+
+    def __init__(self, up=()):
+        self.up = set(up)
+        self.sweeps = []
+        self.gate = None
+        self.cancelled = False
+
+    async def sweep(self, hosts, include_down=False):
+        self.sweeps.append(list(hosts))
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        for host in hosts:
+            if host in self.up:
+                yield {"ip": host, "status": "up", "method": "tcp", "rtt_ms": 1.5}
+            elif include_down:
+                yield {"ip": host, "status": "down", "method": "tcp"}
+
+
+def make_monitor(hosts, up=(), ttl=60):
+    monitor = DeviceStatusMonitor(inventory=StubInventory(hosts), interval=3600, ttl=ttl)
+    monitor.engine = StubEngine(up)
+    return monitor
+
+
+@pytest.mark.asyncio
+async def test_statuses_unknown_before_first_refresh_and_kicks_one():
+    monitor = make_monitor(["10.0.0.1", "10.0.0.2"], up=["10.0.0.1"])
+    entries = monitor.statuses()
+    assert [entry["status"] for entry in entries] == ["unknown", "unknown"]
+    assert monitor._refreshing is not None
+    await monitor._refreshing
+    assert monitor.engine.sweeps == [["10.0.0.1", "10.0.0.2"]]
+    entries = {entry["host"]: entry for entry in monitor.statuses()}
+    assert entries["10.0.0.1"]["status"] == "online"
+    assert entries["10.0.0.1"]["rtt_ms"] == 1.5
+    assert entries["10.0.0.2"]["status"] == "offline"
+    assert not entries["10.0.0.1"]["stale"]
+    await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_known_statuses_do_not_kick_refresh():
+    monitor = make_monitor(["10.0.0.1"], up=["10.0.0.1"])
+    await monitor.refresh()
+    monitor.statuses()
+    assert monitor._refreshing is None
+
+
+@pytest.mark.asyncio
+async def test_entries_go_stale_after_ttl():
+    monitor = make_monitor(["10.0.0.1"], up=["10.0.0.1"], ttl=0.05)
+    await monitor.refresh()
+    assert monitor.statuses()[0]["stale"] is False
+    await asyncio.sleep(0.1)
+    entry = monitor.statuses()[0]
+    assert entry["stale"] is True
+    assert entry["status"] == "online"
+
+
+@pytest.mark.asyncio
+async def test_removed_hosts_dropped_on_refresh():
+    monitor = make_monitor(["10.0.0.1", "10.0.0.2"], up=["10.0.0.1", "10.0.0.2"])
+    await monitor.refresh()
+    assert set(monitor._status) == {"10.0.0.1", "10.0.0.2"}
+    monitor.inventory.hosts = ["10.0.0.2"]
+    await monitor.refresh()
+    assert set(monitor._status) == {"10.0.0.2"}
+    assert [entry["host"] for entry in monitor.statuses()] == ["10.0.0.2"]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_refresh():
+    monitor = make_monitor(["10.0.0.1"])
+    monitor.engine.gate = asyncio.Event()
+    await monitor.start()
+    for _ in range(10):
+        await asyncio.sleep(0)
+        if monitor.engine.sweeps:
+            break
+    assert monitor.engine.sweeps, "refresh never started"
+    refreshing = monitor._refreshing
+    await asyncio.wait_for(monitor.stop(), 1.0)
+    assert refreshing.cancelled()
+    assert monitor.engine.cancelled
+    assert monitor._task is None and monitor._refreshing is None
@@ -0,0 +1,58 @@
+import cProfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import internal
+from app.core.config import settings
+from app.core.profiling import CapturedProfile, ProfileStore
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = ProfileStore(keep=5)
+    profile = cProfile.Profile()
+    profile.enable()
+    sum(range(10))
+    profile.disable()
+    captured = CapturedProfile("GET", "/api/v1/devices", profile)
+    store.add(captured)
+    monkeypatch.setattr(internal, "profile_store", store)
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(internal.router, prefix="/internal")
+    client = TestClient(app)
+    client.profile_id = captured.id
+    return client
+
+
+def test_profiles_readable_with_token(client):
+    headers = {"X-Profile-Token": "s3cret"}
+    listing = client.get("/internal/profiles", headers=headers)
+    assert listing.status_code == 200
+    assert listing.json()[0]["id"] == client.profile_id
+    profile = client.get(f"/internal/profiles/{client.profile_id}", headers=headers)
+    assert profile.status_code == 200
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}])
+def test_profiles_rejected_without_token(client, headers):
+    assert client.get("/internal/profiles", headers=headers).status_code == 403
+    path = f"/internal/profiles/{client.profile_id}"
+    assert client.get(path, headers=headers).status_code == 403
+
+
+def test_profiles_unreadable_without_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", None)
+    response = client.get("/internal/profiles", headers={"X-Profile-Token": ""})
+    assert response.status_code == 403
+
+
+def test_profiles_missing_when_profiling_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    headers = {"X-Profile-Token": "s3cret"}
+    assert client.get("/internal/profiles", headers=headers).status_code == 404
+    path = f"/internal/profiles/{client.profile_id}"
+    assert client.get(path, headers=headers).status_code == 404
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.last_value_cache import LastValueCache
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def row(metric_type, value, timestamp=NOW, device_id=1):
+    return {"device_id": device_id, "metric_type": metric_type, "value": value,
+            "unit": "ms", "timestamp": timestamp}
+
+
+@pytest.mark.asyncio
+async def test_records_newest_value():
+    cache = LastValueCache()
+    await cache.record([row("latency", 5.0)])
+    await cache.record([row("latency", 9.0, NOW - timedelta(minutes=1))])
+    found, missing = await cache.get(1, ["latency", "bandwidth"])
+    assert found["latency"]["value"] == 5.0
+    assert missing == ["bandwidth"]
+
+
+@pytest.mark.asyncio
+async def test_cached_miss_is_neither_found_nor_missing():
+    cache = LastValueCache(miss_ttl=60)
+    cache.record_misses(1, ["packet_loss"])
+    assert await cache.get(1, ["packet_loss"]) == ({}, [])
+    # Other devices are unaffected
+    assert await cache.get(2, ["packet_loss"]) == ({}, ["packet_loss"])
+
+
+@pytest.mark.asyncio
+async def test_cached_miss_expires():
+    cache = LastValueCache(miss_ttl=0)
+    cache.record_misses(1, ["packet_loss"])
+    assert await cache.get(1, ["packet_loss"]) == ({}, ["packet_loss"])
+
+
+@pytest.mark.asyncio
+async def test_record_clears_cached_miss():
+    cache = LastValueCache(miss_ttl=60)
+    cache.record_misses(1, ["bandwidth"])
+    await cache.record([row("bandwidth", 94.2)])
+    found, missing = await cache.get(1, ["bandwidth"])
+    assert found["bandwidth"]["value"] == 94.2
+    assert missing == []
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.services.metric_writer import MetricWriter
+
+
+class RecordingWriter(MetricWriter):
+    """Keeps flushed batches instead of inserting them."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.flushed = asyncio.Event()
+
+    async def _flush(self, batch):
+        if batch:
+            self.batches.append(list(batch))
+            self.flushed.set()
+
+
+def rows(count, start=0):
+    return [{'device_id': 1, 'value': float(i)} for i in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_flushes_full_batch_without_waiting_for_interval():
+    writer = RecordingWriter(batch_size=3, flush_interval=60)
+    await writer.start()
+    try:
+        await writer.submit(rows(7))
+        await asyncio.wait_for(_until(lambda: len(writer.batches) == 2), 1.0)
+        assert [len(batch) for batch in writer.batches] == [3, 3]
+    finally:
+        await writer.stop()
+    # The straggler was taken for the next batch; stop() still writes it
+    assert [len(batch) for batch in writer.batches] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_interval():
+    writer = RecordingWriter(batch_size=100, flush_interval=0.05)
+    await writer.start()
+    try:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await writer.submit(rows(2))
+        await asyncio.wait_for(writer.flushed.wait(), 1.0)
+        assert loop.time() - started >= 0.04
+        assert writer.batches == [rows(2)]
+    finally:
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queue_in_batches():
+    writer = RecordingWriter(batch_size=4, flush_interval=60)
+    # Never started, so everything is still queued at stop()
+    await writer.submit(rows(10))
+    assert writer.stats()['queue_depth'] == 10
+    await writer.stop()
+    assert [len(batch) for batch in writer.batches] == [4, 4, 2]
+    assert [row for batch in writer.batches for row in batch] == rows(10)
+    assert writer.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_submit_blocks_while_queue_full():
+    writer = RecordingWriter(max_queue=2, batch_size=10, flush_interval=60)
+    submit = asyncio.create_task(writer.submit(rows(3)))
+    await asyncio.sleep(0.01)
+    assert not submit.done()
+    writer.queue.get_nowait()
+    await asyncio.wait_for(submit, 1.0)
+    assert writer.stats()['enqueued'] == 3
+    assert writer.stats()['queue_high_watermark'] == 2
+
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
@@ -0,0 +1,105 @@
+import pytest
+
+from app.core.config import settings
+from app.services.device_probe import END_MARKER, build_probe_command, section_marker
+from app.services.metrics_collector import MetricsCollector
+from benchmarks.simulator import SimulatedFleet
+from benchmarks.stubs import StaticInventory
+
+from .conftest import free_port_block
+
+DEVICE = {'name': 'pi0', 'host': '192.0.2.10', 'port': 22, 'username': 'pi',
+          'password': 'pi', 'device_type': 'linux'}
+COMPLETE = "\n".join([
+    section_marker('cpu'),
+    "%Cpu(s):  2.3 us,  1.1 sy,  0.0 ni, 96.4 id,  0.0 wa,  0.0 hi,  0.2 si,  0.0 st",
+    END_MARKER,
+])
+
+
+class FakeConnection:
+    def __init__(self, output):
+        self.output = output
+
+    def send_command(self, command):
+        assert command == build_probe_command()
+        return self.output
+
+
+class FakePool:
+    """Hands func a fake netmiko connection, as SSHSessionPool.run would."""
+
+    def __init__(self, output):
+        self.connection = FakeConnection(output)
+
+    def run(self, device, func):
+        return func(self.connection)
+
+
+def netmiko_collector(output):
+    collector = MetricsCollector(StaticInventory([DEVICE]))
+    collector.ssh_pool = FakePool(output)
+    return collector
+
+
+def test_netmiko_complete_probe_is_online():
+    metrics = netmiko_collector(COMPLETE)._collect_metrics_sync(DEVICE)
+    assert metrics['status'] == 'online'
+    assert metrics['cpu_percent'] == 3.6
+
+
+@pytest.mark.parametrize("output", [
+    COMPLETE.replace(END_MARKER, ""),
+    "",
+])
+def test_netmiko_truncated_probe_is_offline(output):
+    metrics = netmiko_collector(output)._collect_metrics_sync(DEVICE)
+    assert metrics['status'] == 'offline'
+    assert 'end marker' in metrics['error']
+
+
+def test_netmiko_probe_without_metrics_is_offline():
+    output = "\n".join([section_marker('cpu'), "garbage", END_MARKER])
+    metrics = netmiko_collector(output)._collect_metrics_sync(DEVICE)
+    assert metrics['status'] == 'offline'
+    assert metrics['error'] == "no metrics parsed from probe output"
+
+
+@pytest.fixture
+def asyncssh_backend(monkeypatch):
+    monkeypatch.setattr(settings, "SSH_BACKEND", "asyncssh")
+    monkeypatch.setattr(settings, "METRICS_PROBE_MODE", "composite")
+
+
+@pytest.mark.asyncio
+async def test_asyncssh_polls_reuse_one_connection(asyncssh_backend):
+    fleet = SimulatedFleet(1, base_port=free_port_block(1), latency=0, jitter=0, seed=2)
+    await fleet.start()
+    collector = MetricsCollector(StaticInventory(fleet.devices()))
+    try:
+        device = fleet.devices()[0]
+        for _ in range(3):
+            metrics = await collector.collect_device_metrics(device)
+            assert metrics['status'] == 'online', metrics
+            assert {'cpu_percent', 'memory_percent', 'disk_percent',
+                    'temperature_c', 'uptime'} <= metrics.keys()
+        assert collector.async_ssh.stats() == {'open_connections': 1}
+    finally:
+        await collector.close()
+        await fleet.stop()
+
+
+@pytest.mark.asyncio
+async def test_asyncssh_dropped_connection_is_offline_and_evicted(asyncssh_backend):
+    fleet = SimulatedFleet(1, base_port=free_port_block(1), latency=0, jitter=0,
+                           failure_rate=1.0, seed=3)
+    await fleet.start()
+    collector = MetricsCollector(StaticInventory(fleet.devices()))
+    try:
+        metrics = await collector.collect_device_metrics(fleet.devices()[0])
+        assert metrics['status'] == 'offline'
+        assert metrics['error']
+        assert collector.async_ssh.stats() == {'open_connections': 0}
+    finally:
+        await collector.close()
+        await fleet.stop()
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import metrics
+from app.api.endpoints.metrics import _decode_cursor, _encode_cursor
+from app.core.database import get_db
+
+
+@pytest.mark.parametrize("timestamp", [
+    datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 23, 59, 59, tzinfo=timezone(timedelta(hours=-5))),
+    datetime(2024, 3, 1, 0, 0),
+])
+def test_cursor_round_trip(timestamp):
+    cursor = _encode_cursor(timestamp, 4815162342)
+    # Safe to pass in a query string as-is
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    decoded_timestamp, decoded_id = _decode_cursor(cursor)
+    assert decoded_timestamp == timestamp
+    assert decoded_timestamp.utcoffset() == timestamp.utcoffset()
+    assert decoded_id == 4815162342
+
+
+MALFORMED = [
+    "not base64!",
+    "é",
+    "AAAA",
+    # Valid base64 of text without the separator
+    "MjAyNC0wMy0wMQ",
+    # "2024-03-01|1|2"
+    "MjAyNC0wMy0wMXwxfDI",
+    # "yesterday|7"
+    "eWVzdGVyZGF5fDc",
+    # "2024-03-01|seven"
+    "MjAyNC0wMy0wMXxzZXZlbg",
+]
+
+
+@pytest.mark.parametrize("cursor", MALFORMED)
+def test_malformed_cursor_raises_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        _decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", MALFORMED)
+def test_metrics_endpoint_rejects_malformed_cursor(cursor):
+    async def no_db():
+        # The cursor is decoded before any query runs
+        yield None
+
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/metrics")
+    app.dependency_overrides[get_db] = no_db
+    response = TestClient(app).get("/metrics/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,137 @@
+import json
+
+import msgpack
+import pytest
+
+from app.api.endpoints.websocket import ClientConnection
+from app.services.metrics_stream import (
+    PROTOCOL_DELTA_JSON,
+    PROTOCOL_DELTA_MSGPACK,
+    PROTOCOL_FULL_JSON,
+    SnapshotFrames,
+    merge_patch,
+    select_subprotocol,
+)
+
+PREVIOUS = {
+    "pi0": {"status": "online", "cpu_percent": 3.6,
+            "memory_mb": {"total": 3793.0, "used": 412.0}, "uptime": "2024-05-01 10:12:33"},
+    "pi1": {"status": "online", "cpu_percent": 12.0},
+}
+CURRENT = {
+    "pi0": {"status": "online", "cpu_percent": 4.1,
+            "memory_mb": {"total": 3793.0, "used": 430.0}},
+    "router": {"status": "offline", "error": "timed out after 15s"},
+}
+
+
+def apply_merge_patch(target, patch):
+    """RFC 7386 application, as a delta client would do it."""
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_merge_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def snapshot(data):
+    return {"type": "metrics_update", "data": data}
+
+
+def test_merge_patch_nested_changes():
+    patch = merge_patch(PREVIOUS, CURRENT)
+    assert patch["pi0"]["cpu_percent"] == 4.1
+    assert patch["pi0"]["memory_mb"] == {"used": 430.0}
+    assert "status" not in patch["pi0"]
+    assert patch["router"] == CURRENT["router"]
+
+
+def test_merge_patch_removed_keys_become_null():
+    patch = merge_patch(PREVIOUS, CURRENT)
+    assert patch["pi1"] is None
+    assert patch["pi0"]["uptime"] is None
+
+
+def test_merge_patch_no_op_is_empty():
+    assert merge_patch(PREVIOUS, json.loads(json.dumps(PREVIOUS))) == {}
+
+
+def test_merge_patch_replaces_lists_wholesale():
+    assert merge_patch({"hosts": [1, 2]}, {"hosts": [1, 3]}) == {"hosts": [1, 3]}
+
+
+def test_applying_patch_reproduces_snapshot():
+    assert apply_merge_patch(PREVIOUS, merge_patch(PREVIOUS, CURRENT)) == CURRENT
+
+
+def test_json_and_msgpack_encodings_match():
+    frames = SnapshotFrames(7, snapshot(CURRENT), snapshot(PREVIOUS))
+    assert json.loads(frames.keyframe(False)) == msgpack.unpackb(frames.keyframe(True))
+    delta = json.loads(frames.delta(False))
+    assert delta == msgpack.unpackb(frames.delta(True))
+    assert delta == {"type": "delta", "seq": 7, "base": 6, "patch": merge_patch(PREVIOUS, CURRENT)}
+
+
+def test_frames_are_encoded_once():
+    frames = SnapshotFrames(1, snapshot(CURRENT))
+    assert frames.delta(False) is frames.delta(False)
+    assert frames.full() is frames.full()
+    assert json.loads(frames.full()) == snapshot(CURRENT)
+
+
+def test_first_delta_patches_from_empty():
+    frames = SnapshotFrames(1, snapshot(CURRENT))
+    assert json.loads(frames.delta(False))["patch"] == CURRENT
+
+
+def test_select_subprotocol():
+    assert select_subprotocol(["other", PROTOCOL_DELTA_JSON]) == PROTOCOL_DELTA_JSON
+    assert select_subprotocol([PROTOCOL_DELTA_MSGPACK]) == PROTOCOL_DELTA_MSGPACK
+    assert select_subprotocol(["other"]) is None
+
+
+def frame_sequence(count):
+    data = {"pi0": {"cpu_percent": 0.0}}
+    previous = None
+    for seq in range(1, count + 1):
+        current = snapshot({"pi0": {"cpu_percent": float(seq)}}) if seq > 1 else snapshot(data)
+        yield SnapshotFrames(seq, current, previous)
+        previous = current
+
+
+def drain(client):
+    frames = []
+    while not client.queue.empty():
+        frames.append(json.loads(client.queue.get_nowait()))
+    return frames
+
+
+def test_delta_client_gets_keyframe_then_deltas():
+    client = ClientConnection(websocket=None, queue_size=4, protocol=PROTOCOL_DELTA_JSON)
+    for frames in frame_sequence(3):
+        client.offer(frames)
+    assert [frame["type"] for frame in drain(client)] == ["keyframe", "delta", "delta"]
+
+
+def test_overflow_resyncs_delta_client_with_keyframe():
+    client = ClientConnection(websocket=None, queue_size=2, protocol=PROTOCOL_DELTA_JSON)
+    for frames in frame_sequence(3):
+        client.offer(frames)
+    # keyframe 1 and delta 2 filled the queue; 3 would overflow it
+    frames = drain(client)
+    assert [(frame["type"], frame["seq"]) for frame in frames] == [("keyframe", 3)]
+    assert client.dropped == 2
+    assert frames[0]["data"] == {"pi0": {"cpu_percent": 3.0}}
+
+
+@pytest.mark.parametrize("protocol", [None, PROTOCOL_FULL_JSON])
+def test_full_client_drops_oldest_snapshot(protocol):
+    client = ClientConnection(websocket=None, queue_size=2, protocol=protocol)
+    for frames in frame_sequence(3):
+        client.offer(frames)
+    assert [frame["data"]["pi0"]["cpu_percent"] for frame in drain(client)] == [2.0, 3.0]
+    assert client.dropped == 1
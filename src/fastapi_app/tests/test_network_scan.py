@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.endpoints import network, websocket
+from app.services.network_scanner import NetworkScanner
+
+RESULTS = [
+    {"ip": "10.0.0.1", "status": "up", "method": "tcp", "port": 22, "rtt_ms": 0.4},
+    {"ip": "10.0.0.2", "status": "down", "method": "tcp"},
+    {"ip": "10.0.0.3", "status": "up", "method": "tcp", "port": 80, "rtt_ms": 0.9},
+]
+
+
+class StubEngine:
+    """Replays canned results; with ``hang`` the sweep then never ends."""
+
+    max_hosts = 65536
+
+    def __init__(self):
+        self.hang = False
+        self.cancelled = False
+
+    async def sweep(self, target, include_down=False):
+        for result in RESULTS:
+            if include_down or result["status"] == "up":
+                yield result
+        if self.hang:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    scanner = NetworkScanner(
+        engine=StubEngine(),
+        allowed_subnets=["10.0.0.0/24"],
+        max_streams=1
+    )
+    monkeypatch.setattr(network, "_network_scanner", scanner)
+    return scanner
+
+
+@pytest.fixture
+def app(scanner):
+    app = FastAPI()
+    app.include_router(network.router, prefix="/network")
+    app.include_router(websocket.router, prefix="/ws")
+    return app
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_sse_event_order(app, scanner):
+    response = TestClient(app).get("/network/scan/stream", params={"subnet": "10.0.0.0/30"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["host", "host", "progress", "summary"]
+    assert [data["ip"] for _, data in events[:2]] == ["10.0.0.1", "10.0.0.3"]
+    assert events[2][1]["probed"] == 3 and events[2][1]["found"] == 2
+    assert events[2][1]["total"] == 2
+    assert events[3][1]["active_hosts"] == 2
+    assert scanner.active_streams == 0
+
+
+def test_sse_rejects_disallowed_subnet(app):
+    response = TestClient(app).get("/network/scan/stream", params={"subnet": "8.8.8.0/24"})
+    assert response.status_code == 400
+    response = TestClient(app).get("/network/scan/stream", params={"subnet": "bogus"})
+    assert response.status_code == 400
+
+
+def test_sse_rejects_when_streams_full(app, scanner):
+    scanner.active_streams = scanner.max_streams
+    response = TestClient(app).get("/network/scan/stream", params={"subnet": "10.0.0.0/30"})
+    assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_sse_disconnect_releases_stream(app, scanner):
+    scanner.engine.hang = True
+    requested = False
+    disconnected = asyncio.Event()
+    chunks = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"])
+            if len(chunks) == 2:
+                assert scanner.active_streams == 1
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/network/scan/stream",
+        "raw_path": b"/network/scan/stream",
+        "root_path": "",
+        "query_string": b"subnet=10.0.0.0/30",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 2.0)
+    assert [name for name, _ in parse_sse(b"".join(chunks).decode())] == ["host", "host"]
+    assert scanner.engine.cancelled
+    assert scanner.active_streams == 0
+
+
+def test_ws_event_order(app, scanner):
+    with TestClient(app).websocket_connect("/ws/scan?subnet=10.0.0.0/30") as ws:
+        frames = [ws.receive_json() for _ in range(4)]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert [frame["type"] for frame in frames] == ["host", "host", "progress", "summary"]
+    assert closed.value.code == 1000
+    assert scanner.active_streams == 0
+
+
+def test_ws_rejects_disallowed_subnet(app):
+    with TestClient(app).websocket_connect("/ws/scan?subnet=8.8.8.0/24") as ws:
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+
+def test_ws_rejects_when_streams_full(app, scanner):
+    scanner.active_streams = scanner.max_streams
+    with TestClient(app).websocket_connect("/ws/scan?subnet=10.0.0.0/30") as ws:
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1013
+
+
+def test_ws_disconnect_releases_stream(app, scanner):
+    scanner.engine.hang = True
+    with TestClient(app).websocket_connect("/ws/scan?subnet=10.0.0.0/30") as ws:
+        assert ws.receive_json()["type"] == "host"
+        assert ws.receive_json()["type"] == "host"
+        assert scanner.active_streams == 1
+    # Leaving the block disconnects and waits for the endpoint to return
+    assert scanner.engine.cancelled
+    assert scanner.active_streams == 0
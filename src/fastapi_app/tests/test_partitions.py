@@ -0,0 +1,105 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.core import partitions
+from app.core.partitions import _day_bounds, _parse_partition_day, partition_name
+
+
+class FakeResult:
+    def __init__(self, names=()):
+        self.names = list(names)
+
+    def scalars(self):
+        return iter(self.names)
+
+    def scalar(self):
+        return False
+
+
+class FakeConn:
+    """Records statements; the catalog lists ``existing`` partitions."""
+
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if "pg_inherits" in sql:
+            return FakeResult(self.existing)
+        return FakeResult()
+
+
+def test_partition_name_round_trip():
+    assert partition_name(date(2024, 2, 29)) == "network_metrics_p20240229"
+    assert _parse_partition_day("network_metrics_p20240229") == date(2024, 2, 29)
+    assert _parse_partition_day("network_metrics_default") is None
+    assert _parse_partition_day("network_metrics_p20240230") is None
+    assert _parse_partition_day("other_p20240229") is None
+
+
+@pytest.mark.parametrize("day", [date(2023, 12, 31), date(2024, 2, 28), date(2024, 3, 10)])
+def test_day_bounds_are_utc_midnights(day):
+    lower, upper = _day_bounds(day)
+    assert lower == datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    assert upper - lower == timedelta(days=1)
+    assert upper == _day_bounds(day + timedelta(days=1))[0]
+    assert lower.utcoffset() == timedelta(0)
+
+
+@pytest.mark.parametrize("timestamp, expected", [
+    (datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc), date(2024, 1, 1)),
+    (datetime(2023, 12, 31, 23, 59, 59, 999999, tzinfo=timezone.utc), date(2023, 12, 31)),
+    # Local evening west of UTC is already the next UTC day
+    (datetime(2023, 12, 31, 19, 30, tzinfo=timezone(timedelta(hours=-5))), date(2024, 1, 1)),
+    # Local early morning east of UTC is still the previous UTC day
+    (datetime(2024, 1, 1, 1, 0, tzinfo=timezone(timedelta(hours=2))), date(2023, 12, 31)),
+])
+def test_timestamp_falls_in_its_utc_day(timestamp, expected):
+    lower, upper = _day_bounds(expected)
+    assert lower <= timestamp < upper
+
+
+@pytest.mark.asyncio
+async def test_create_partitions_across_year_end():
+    conn = FakeConn(existing=["network_metrics_p20231231"])
+    created = await partitions.create_partitions(conn, date(2023, 12, 31), 3)
+    assert created == ["network_metrics_p20240101", "network_metrics_p20240102"]
+    creates = [sql for sql, _ in conn.statements if "FOR VALUES" in sql]
+    assert creates == [
+        "CREATE TABLE IF NOT EXISTS network_metrics_p20240101 PARTITION OF network_metrics"
+        " FOR VALUES FROM ('2024-01-01T00:00:00+00:00') TO ('2024-01-02T00:00:00+00:00')",
+        "CREATE TABLE IF NOT EXISTS network_metrics_p20240102 PARTITION OF network_metrics"
+        " FOR VALUES FROM ('2024-01-02T00:00:00+00:00') TO ('2024-01-03T00:00:00+00:00')",
+    ]
+    assert conn.statements[-1][0].endswith("PARTITION OF network_metrics DEFAULT")
+
+
+@pytest.mark.asyncio
+async def test_drop_expired_uses_utc_cutoff(monkeypatch):
+    monkeypatch.setattr(partitions, "_utc_today", lambda: date(2024, 3, 1))
+    conn = FakeConn(existing=[
+        "network_metrics_default",
+        "network_metrics_p20240228",
+        "network_metrics_p20240229",
+        "network_metrics_p20240301",
+    ])
+    dropped = await partitions.drop_expired(conn, retention_days=1)
+    assert dropped == ["network_metrics_p20240228"]
+    sql, params = conn.statements[-1]
+    assert sql.startswith("DELETE FROM network_metrics_default")
+    assert params == {"cutoff": datetime(2024, 2, 29, tzinfo=timezone.utc)}
+
+
+def test_utc_today_ignores_local_timezone(monkeypatch):
+    class LateEvening(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # 23:30 in New York is already tomorrow in UTC
+            local = datetime(2024, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+            return local.astimezone(tz) if tz else local.replace(tzinfo=None)
+
+    monkeypatch.setattr(partitions, "datetime", LateEvening)
+    assert partitions._utc_today() == date(2024, 3, 2)
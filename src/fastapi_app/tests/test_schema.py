@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import Column, Index, Integer, create_engine, func, inspect, select
+from sqlalchemy.orm import declarative_base
+
+from app.core import database, schema
+
+
+@pytest.fixture(autouse=True)
+def sqlite_models(monkeypatch):
+    # The real models are Postgres-only (partitioning, composite keys), so
+    # ensure_schema is exercised against a small stand-in declarative base
+    base = declarative_base()
+
+    class Widget(base):
+        __tablename__ = "widgets"
+        id = Column(Integer, primary_key=True)
+        size = Column(Integer)
+
+    Index("ix_widgets_size", Widget.size)
+    monkeypatch.setattr(database, "Base", base)
+    monkeypatch.setattr(schema, "Base", base)
+
+
+def test_ensure_schema_applies_once():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        assert schema.ensure_schema(conn) is True
+    with engine.begin() as conn:
+        assert schema.ensure_schema(conn) is False
+        assert schema.current_version(conn) == schema.SCHEMA_VERSION
+        rows = conn.execute(select(func.count()).select_from(schema.schema_version)).scalar()
+        indexes = [index["name"] for index in inspect(conn).get_indexes("widgets")]
+    assert rows == 1
+    assert indexes == ["ix_widgets_size"]
+
+
+def test_ensure_schema_upgrades_older_version(monkeypatch):
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(schema, "SCHEMA_VERSION", 1)
+    with engine.begin() as conn:
+        schema.ensure_schema(conn)
+    monkeypatch.setattr(schema, "SCHEMA_VERSION", 2)
+    with engine.begin() as conn:
+        assert schema.ensure_schema(conn) is True
+        assert schema.current_version(conn) == 2
+
+
+def test_ensure_schema_leaves_newer_database_alone(monkeypatch):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        schema.ensure_schema(conn)
+    monkeypatch.setattr(schema, "SCHEMA_VERSION", schema.SCHEMA_VERSION - 1)
+    with engine.begin() as conn:
+        assert schema.ensure_schema(conn) is False
+
+
+def test_worker_that_loses_the_race_skips_the_upgrade(monkeypatch):
+    # Behind before the advisory lock, current once another worker's
+    # upgrade has committed and the lock is granted
+    versions = iter([schema.SCHEMA_VERSION - 1, schema.SCHEMA_VERSION])
+    monkeypatch.setattr(schema, "current_version", lambda conn: next(versions))
+
+    class Conn:
+        dialect = type("Dialect", (), {"name": "postgresql"})()
+        statements = []
+
+        def execute(self, statement, params=None):
+            self.statements.append(str(statement))
+
+    conn = Conn()
+    assert schema.ensure_schema(conn) is False
+    assert conn.statements == ["SELECT pg_advisory_xact_lock(:key)"]
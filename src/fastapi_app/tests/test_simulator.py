@@ -0,0 +1,31 @@
+import pytest
+
+from app.core.config import settings
+from app.services.metrics_collector import MetricsCollector
+from benchmarks.simulator import SimulatedFleet
+from benchmarks.stubs import StaticInventory
+
+from .conftest import free_port_block
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["netmiko", "asyncssh"])
+async def test_collector_polls_simulated_fleet(monkeypatch, backend):
+    monkeypatch.setattr(settings, "SSH_BACKEND", backend)
+    fleet = SimulatedFleet(2, base_port=free_port_block(2), latency=0.01, jitter=0, seed=1)
+    await fleet.start()
+    collector = MetricsCollector(StaticInventory(fleet.devices()))
+    try:
+        for _ in range(2):
+            metrics = await collector.collect_all_metrics()
+            assert set(metrics) == {"sim-0000", "sim-0001"}
+            for device in metrics.values():
+                assert device["status"] == "online", device
+                assert 0 <= device["cpu_percent"] <= 100
+                assert "memory_percent" in device
+                assert "temperature_c" in device
+    finally:
+        await collector.close()
+        await fleet.stop()
+    # The second cycle reused each device's session
+    assert fleet.stats["sessions"] == (2 if backend == "netmiko" else 4)
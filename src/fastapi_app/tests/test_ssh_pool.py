@@ -0,0 +1,100 @@
+import pytest
+from netmiko.exceptions import ReadTimeout
+
+from app.services.ssh_pool import PooledSession, SSHSessionPool
+
+DEVICE = {'name': 'pi0', 'host': '192.0.2.10', 'port': 22, 'username': 'pi',
+          'password': 'pi', 'device_type': 'linux'}
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.disconnected = False
+
+    def is_alive(self):
+        return not self.disconnected
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class FakePool(SSHSessionPool):
+    """SSHSessionPool whose connection factory hands out fakes."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.opened = []
+
+    def _open(self, device):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return PooledSession(connection)
+
+
+def failing(*errors):
+    """A poll raising each of ``errors`` in turn, then succeeding."""
+    pending = list(errors)
+
+    def poll(connection):
+        if pending:
+            raise pending.pop(0)
+        return connection.number
+
+    return poll
+
+
+def test_session_reused_across_polls():
+    pool = FakePool()
+    assert pool.run(DEVICE, lambda connection: connection.number) == 0
+    assert pool.run(DEVICE, lambda connection: connection.number) == 0
+    assert len(pool.opened) == 1
+    assert pool.stats()['open_sessions'] == 1
+
+
+def test_idle_session_evicted():
+    pool = FakePool(idle_timeout=60)
+    pool.run(DEVICE, lambda connection: None)
+    session = pool._sessions[pool._key(DEVICE)]
+    session.last_used -= 61
+    pool.evict_idle()
+    assert pool.stats()['open_sessions'] == 0
+    assert pool.opened[0].disconnected
+    # The next poll opens a fresh session
+    assert pool.run(DEVICE, lambda connection: connection.number) == 1
+
+
+@pytest.mark.parametrize("error", [OSError("Socket is closed"), EOFError(), ReadTimeout("no prompt")])
+def test_transport_error_on_reused_session_reconnects_once(error):
+    pool = FakePool()
+    pool.run(DEVICE, lambda connection: None)
+    assert pool.run(DEVICE, failing(error)) == 1
+    assert pool.opened[0].disconnected
+    assert len(pool.opened) == 2
+
+
+def test_second_transport_error_is_raised():
+    pool = FakePool()
+    pool.run(DEVICE, lambda connection: None)
+    with pytest.raises(OSError):
+        pool.run(DEVICE, failing(OSError(), OSError()))
+    assert len(pool.opened) == 2
+    assert pool.stats()['open_sessions'] == 0
+
+
+def test_transport_error_on_fresh_session_is_not_retried():
+    pool = FakePool()
+    with pytest.raises(EOFError):
+        pool.run(DEVICE, failing(EOFError()))
+    assert len(pool.opened) == 1
+    assert pool.stats()['open_sessions'] == 0
+
+
+def test_other_errors_keep_the_session():
+    pool = FakePool()
+    pool.run(DEVICE, lambda connection: None)
+    with pytest.raises(ValueError):
+        pool.run(DEVICE, failing(ValueError("could not convert string to float")))
+    assert len(pool.opened) == 1
+    assert not pool.opened[0].disconnected
+    assert pool.run(DEVICE, lambda connection: connection.number) == 0
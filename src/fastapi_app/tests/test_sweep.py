@@ -0,0 +1,115 @@
+import asyncio
+import ipaddress
+import socket
+import struct
+import time
+
+import pytest
+
+from app.services.sweep import (
+    ICMP_ECHO_REQUEST,
+    TokenBucket,
+    _checksum,
+    count_targets,
+    echo_request,
+    expand_targets,
+    tcp_probe,
+)
+
+
+def test_echo_request_checksum_verifies():
+    packet = echo_request(0x1234, 7)
+    kind, code, checksum, identifier, sequence = struct.unpack("!BBHHH", packet[:8])
+    assert (kind, code, identifier, sequence) == (ICMP_ECHO_REQUEST, 0, 0x1234, 7)
+    assert packet[8:] == b"vandine-sweep"
+    # Summing a packet including its own checksum gives zero
+    assert _checksum(packet) == 0
+    assert checksum != 0
+
+
+def test_echo_request_checksum_odd_payload():
+    packet = echo_request(1, 1, payload=b"abc")
+    assert _checksum(packet) == 0
+
+
+@pytest.mark.parametrize("target", [
+    "10.0.0.0/24",
+    "10.0.0.0/30",
+    "10.0.0.0/31",
+    "10.0.0.7/32",
+    "10.0.0.7",
+    ipaddress.IPv4Network("192.168.4.0/29"),
+])
+def test_count_matches_expand(target):
+    assert count_targets(target) == len(list(expand_targets(target)))
+
+
+def test_expand_targets_edges():
+    assert list(expand_targets("10.0.0.7")) == ["10.0.0.7"]
+    assert list(expand_targets("10.0.0.0/31")) == ["10.0.0.0", "10.0.0.1"]
+    assert list(expand_targets("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+    assert list(expand_targets(["a", "b"])) == ["a", "b"]
+    assert count_targets(["a", "b"]) == 2
+    assert count_targets(iter(["a"])) is None
+
+
+def test_expand_targets_rejects_bad_targets_up_front():
+    with pytest.raises(ValueError):
+        expand_targets("10.0.0.0/16", max_hosts=1024)
+    with pytest.raises(ValueError):
+        expand_targets("fe80::/120")
+    with pytest.raises(ValueError):
+        expand_targets("not-a-network")
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=100, burst=2)
+    started = time.monotonic()
+    for _ in range(2):
+        await bucket.acquire()
+    assert time.monotonic() - started < 0.01
+    for _ in range(5):
+        await bucket.acquire()
+    # Five tokens beyond the burst at 100/s
+    assert time.monotonic() - started >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_unlimited():
+    bucket = TokenBucket(rate=0)
+    started = time.monotonic()
+    for _ in range(1000):
+        await bucket.acquire()
+    assert time.monotonic() - started < 0.1
+
+
+@pytest.mark.asyncio
+async def test_tcp_probe_listening_port():
+    accepted = asyncio.Event()
+
+    async def handle(reader, writer):
+        accepted.set()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        found = await tcp_probe("127.0.0.1", [port], timeout=1.0)
+        assert found is not None
+        rtt, answered = found
+        assert answered == port and rtt >= 0
+        await asyncio.wait_for(accepted.wait(), 1.0)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_tcp_probe_closed_port_counts_as_up():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed = sock.getsockname()[1]
+    found = await tcp_probe("127.0.0.1", [closed], timeout=1.0, bucket=TokenBucket(rate=0))
+    assert found is not None
+    assert found[1] == closed